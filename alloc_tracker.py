@@ -0,0 +1,173 @@
+"""
+Allocation Tracker - Attributes per-frame Surface and heap allocations to call sites and game states
+"""
+
+import os
+import sys
+import tracemalloc
+import pygame
+
+# Frames ignored at the start of each state while scenes are built
+WARMUP_FRAMES = 10
+
+# A site allocating in at least this share of a state's frames is flagged
+EVERY_FRAME_RATIO = 0.95
+
+class AllocationTracker:
+    """Counts Surface creations per frame by call site and samples tracemalloc for heap growth"""
+    def __init__(self, surface_budget=None, byte_budget=None, max_frames=None, snapshot_interval=60):
+        self.surface_budget = surface_budget
+        self.byte_budget = byte_budget
+        self.max_frames = max_frames
+        self.snapshot_interval = snapshot_interval
+
+        # Current frame
+        self.state = None
+        self.frame_sites = {}  # (site, kind) -> count this frame
+        self.frame_start_bytes = 0
+
+        # Totals
+        self.frames = 0
+        self.state_frames = {}  # state -> frames counted
+        self.site_frames = {}  # (state, site, kind) -> frames with an allocation
+        self.site_counts = {}  # (state, site, kind) -> allocations
+        self.frame_bytes = []  # heap bytes allocated per frame
+        self.budget_failures = 0
+        self.worst_frame = 0
+        self.growth = []  # StatisticDiff entries from the last snapshot comparison
+        self.last_snapshot = None
+
+        self.originals = {}
+        self.finished = False
+
+    def install(self):
+        """Start tracemalloc and wrap the pygame calls that create surfaces"""
+        tracemalloc.start(1)
+        tracker = self
+
+        class CountingSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                tracker.count('Surface')
+
+        class CountingFont(pygame.font.Font):
+            def render(self, *args, **kwargs):
+                tracker.count('Font.render')
+                return super().render(*args, **kwargs)
+
+        self.originals[(pygame, 'Surface')] = pygame.Surface
+        self.originals[(pygame.font, 'Font')] = pygame.font.Font
+        pygame.Surface = CountingSurface
+        pygame.font.Font = CountingFont
+
+        for name in ('scale', 'smoothscale', 'rotate', 'rotozoom', 'flip', 'scale2x'):
+            original = getattr(pygame.transform, name)
+            self.originals[(pygame.transform, name)] = original
+            setattr(pygame.transform, name, self.counting(original, 'transform.' + name))
+
+    def uninstall(self):
+        """Restore the wrapped pygame calls and stop tracemalloc"""
+        for (module, name), original in self.originals.items():
+            setattr(module, name, original)
+        self.originals = {}
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def counting(self, function, kind):
+        """Wrap a surface-returning function so each call is counted"""
+        def wrapper(*args, **kwargs):
+            self.count(kind)
+            return function(*args, **kwargs)
+        return wrapper
+
+    def count(self, kind):
+        """Record one allocation against the caller of the wrapped function"""
+        frame = sys._getframe(2)
+        site = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+        key = (site, kind)
+        self.frame_sites[key] = self.frame_sites.get(key, 0) + 1
+
+    def begin_frame(self, state):
+        """Start attributing allocations to a frame of the given game state"""
+        self.state = state
+        self.frame_sites = {}
+        tracemalloc.reset_peak()
+        self.frame_start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self):
+        """Close the frame, update totals and check the budget"""
+        state = self.state
+        self.frames += 1
+        state_frame = self.state_frames.get(state, 0) + 1
+        self.state_frames[state] = state_frame
+        allocated = tracemalloc.get_traced_memory()[1] - self.frame_start_bytes
+
+        if state_frame > WARMUP_FRAMES:
+            surfaces = 0
+            for (site, kind), count in self.frame_sites.items():
+                key = (state, site, kind)
+                self.site_frames[key] = self.site_frames.get(key, 0) + 1
+                self.site_counts[key] = self.site_counts.get(key, 0) + count
+                surfaces += count
+            self.frame_bytes.append(allocated)
+            self.worst_frame = max(self.worst_frame, surfaces)
+
+            over_surfaces = self.surface_budget is not None and surfaces > self.surface_budget
+            over_bytes = self.byte_budget is not None and allocated > self.byte_budget
+            if over_surfaces or over_bytes:
+                self.budget_failures += 1
+
+        if self.snapshot_interval and self.frames % self.snapshot_interval == 0:
+            self.compare_snapshots()
+
+    def compare_snapshots(self):
+        """Diff the heap against the previous sample to find sites that keep growing"""
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        if self.last_snapshot is not None:
+            self.growth = [stat for stat in snapshot.compare_to(self.last_snapshot, 'lineno') if stat.size_diff > 0]
+        self.last_snapshot = snapshot
+
+    def done(self):
+        """Check if the requested number of frames has been tracked"""
+        return self.max_frames is not None and self.frames >= self.max_frames
+
+    def failed(self):
+        """Check if any frame went over the allocation budget"""
+        return self.budget_failures > 0
+
+    def format(self):
+        """Format the report as printable lines"""
+        lines = [f"Allocation report: {self.frames} frames"]
+        for state, frames in sorted(self.state_frames.items()):
+            counted = max(frames - WARMUP_FRAMES, 0)
+            lines.append(f"  {state} ({counted} frames)")
+            sites = [(key, hits) for key, hits in self.site_frames.items() if key[0] == state]
+            sites.sort(key=lambda item: -self.site_counts[item[0]])
+            for (_, site, kind), hits in sites:
+                ratio = hits / counted if counted else 0
+                flag = "  EVERY FRAME" if ratio >= EVERY_FRAME_RATIO else ""
+                per_frame = self.site_counts[(state, site, kind)] / counted
+                lines.append(f"    {per_frame:6.2f}/frame {ratio:4.0%}  {kind:<18} {site}{flag}")
+
+        if self.frame_bytes:
+            average = sum(self.frame_bytes) / len(self.frame_bytes)
+            lines.append(f"  heap per frame: avg {average:.0f} B, max {max(self.frame_bytes)} B")
+        for stat in self.growth[:5]:
+            lines.append(f"  heap growth: {stat.size_diff:+d} B at {stat.traceback}")
+
+        if self.surface_budget is not None or self.byte_budget is not None:
+            status = "FAILED" if self.failed() else "ok"
+            lines.append(f"  budget {status}: {self.budget_failures} frames over, "
+                         f"worst frame {self.worst_frame} surface allocations")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Print the report once and restore pygame"""
+        if self.finished:
+            return
+        self.finished = True
+        print(self.format())
+        self.uninstall()
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Match Analytics - Aggregates archives of replays and telemetry into death heatmaps, chain lengths and spawn win rates
+Usage: python analytics.py PATH ... [--map PATH] [--cache DIR] [--save RESULTS.npz]
+PATH can be a replay (.bmrp), a telemetry file (.bin or .jsonl) or a directory searched for them.
+Each file is summarised once and cached by path, size and modification time, so re-runs only read new matches.
+Spawn points and wins only come from replays; telemetry does not record where a match started.
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import sys
+import time
+import hashlib
+import numpy as np
+from settings import TICK_RATE, TILE_SIZE, SUBPIXELS
+from map_manager import MapManager
+from replay import read_replay
+from cli import argument, positional_arguments
+from telemetry import (BOMB_DETONATED, CHAIN_REACTION, BRICKS_DESTROYED, PLAYER_DIED, TICK_SUMMARY,
+                       EVENT_FIELDS, CAUSE_NAMES, BINARY_MAGIC, RECORD, read_events)
+
+REPLAY_EXTENSIONS = ('.bmrp',)
+TELEMETRY_EXTENSIONS = ('.bin', '.jsonl')
+
+# Binary telemetry records read straight into columns, a chunk at a time
+RECORD_DTYPE = np.dtype([('code', '<u1'), ('tick', '<u4'), ('fields', '<i4', 5)])
+assert RECORD_DTYPE.itemsize == RECORD.size
+TELEMETRY_CHUNK = 1 << 16  # records
+
+# Bumped whenever the cached summaries change shape
+CACHE_VERSION = 1
+
+# Heatmap shading, lightest to darkest
+HEAT_CHARS = " .:-=+*#%@"
+
+class EventCollector:
+    """Stands in for a level's telemetry stream while a replay is re-simulated, keeping the events in memory"""
+    def __init__(self):
+        self.events = []
+
+    def emit(self, code, tick, *fields):
+        """Keep one event as a fixed-width row"""
+        self.events.append((code, tick) + fields + (0,) * (5 - len(fields)))
+
+    def record_tick_time(self, tick, seconds):
+        """Tick timings mean nothing in a re-simulation"""
+
+    def columns(self):
+        """The events as code, tick and field arrays"""
+        rows = np.array(self.events, dtype=np.int64).reshape(-1, 7)
+        return rows[:, 0], rows[:, 1], rows[:, 2:]
+
+class EventSummarizer:
+    """Folds a stream of telemetry events into per-tile, per-chain and per-match totals, one chunk at a time"""
+    NO_TICK = np.iinfo(np.int64).max
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.deaths = np.zeros(width * height, dtype=np.int64)  # Deaths per tile index
+        self.chains = np.zeros(0, dtype=np.int64)  # Chain reactions per length
+        self.detonations = 0
+
+        # One entry per match
+        self.first_brick = np.zeros(0, dtype=np.int64)  # Tick the first brick went, NO_TICK if none did
+        self.death_tick = np.zeros(0, dtype=np.int64)  # NO_TICK if the player survived
+        self.end_tick = np.zeros(0, dtype=np.int64)  # Last tick seen
+
+        self.last_tick = None
+
+    def new_match(self):
+        """Start a match explicitly, for sources that know where matches begin"""
+        self.grow(len(self.end_tick) + 1)
+        self.last_tick = None
+
+    def grow(self, matches):
+        """Make room for this many matches"""
+        extra = matches - len(self.end_tick)
+        if extra > 0:
+            self.first_brick = np.concatenate((self.first_brick, np.full(extra, self.NO_TICK, dtype=np.int64)))
+            self.death_tick = np.concatenate((self.death_tick, np.full(extra, self.NO_TICK, dtype=np.int64)))
+            self.end_tick = np.concatenate((self.end_tick, np.zeros(extra, dtype=np.int64)))
+
+    def split_matches(self, ticks, deaths):
+        """Match number of every event in a chunk, carrying on from the last match seen"""
+        # Telemetry has no match markers: each reset starts the tick count again,
+        # and only the rest of the tick the player died on can follow a death
+        starts = np.zeros(len(ticks), dtype=bool)
+        if self.last_tick is not None:
+            starts[0] = ticks[0] < self.last_tick or ticks[0] > self.death_tick[-1]
+        starts[1:] = ticks[1:] < ticks[:-1]
+        index = np.arange(len(ticks))
+        while True:
+            local = np.cumsum(starts)  # 0 for events that continue the last match seen
+            death_tick = np.full(local[-1] + 1, self.NO_TICK, dtype=np.int64)
+            death_tick[0] = self.death_tick[-1]
+            np.minimum.at(death_tick, local[deaths], ticks[deaths])
+            late = ticks > death_tick[local]
+            if not late.any():
+                break
+            # The first event after each death begins another match, which may have its own death
+            first_late = np.full(len(death_tick), len(ticks))
+            np.minimum.at(first_late, local[late], index[late])
+            starts[first_late[first_late < len(ticks)]] = True
+        return len(self.end_tick) - 1 + local
+
+    def feed(self, codes, ticks, fields):
+        """Add a chunk of events, in the order they happened"""
+        keep = codes != TICK_SUMMARY  # Summaries keep coming on the death screen, after the match is over
+        codes, ticks, fields = codes[keep], ticks[keep].astype(np.int64), fields[keep]
+        if not len(codes):
+            return
+        if not len(self.end_tick):
+            self.new_match()
+
+        deaths = codes == PLAYER_DIED
+        match = self.split_matches(ticks, deaths)
+        self.grow(match[-1] + 1)
+        self.last_tick = ticks[-1]
+
+        np.maximum.at(self.end_tick, match, ticks)
+        np.minimum.at(self.death_tick, match[deaths], ticks[deaths])
+        x, y = fields[deaths, 0], fields[deaths, 1]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        self.deaths += np.bincount(y[inside] * self.width + x[inside], minlength=self.width * self.height)
+
+        lengths = np.bincount(fields[codes == CHAIN_REACTION, 0])
+        if len(lengths) > len(self.chains):
+            self.chains = np.pad(self.chains, (0, len(lengths) - len(self.chains)))
+        self.chains[:len(lengths)] += lengths
+        self.detonations += int(np.count_nonzero(codes == BOMB_DETONATED))
+
+        bricks = codes == BRICKS_DESTROYED
+        np.minimum.at(self.first_brick, match[bricks], ticks[bricks])
+
+    def summary(self, spawns=None):
+        """Everything gathered, as arrays ready to cache; spawns is the spawn index per match, if known"""
+        matches = len(self.end_tick)
+        return {
+            'deaths': self.deaths,
+            'chains': self.chains,
+            'detonations': np.array(self.detonations),
+            'first_brick': np.where(self.first_brick == self.NO_TICK, -1, self.first_brick),
+            'died': self.death_tick != self.NO_TICK,
+            'end_tick': self.end_tick,
+            'spawn': np.full(matches, -1, dtype=np.int64) if spawns is None else np.asarray(spawns, dtype=np.int64),
+        }
+
+class ReplaySimulator:
+    """A headless level that re-simulates replays to recover their events, built on first use"""
+    def __init__(self):
+        self.surface = None
+        self.sprite_manager = None
+        self.levels = {}  # Map path -> level
+
+    def level(self, map_path):
+        """Headless level for a map, reused across replays"""
+        if map_path not in self.levels:
+            # Imported here so cached runs never start pygame
+            import pygame
+            from environment import init_headless
+            from sprite_manager import SpriteManager
+            from game_state_manager import GameStateManager
+            from level import Level
+            if self.surface is None:
+                self.surface = init_headless()
+                self.sprite_manager = SpriteManager()
+            level = Level(self.surface, GameStateManager('level'), pygame.time.Clock(), self.sprite_manager, map_path)
+            level.effects = False
+            self.levels[map_path] = level
+        return self.levels[map_path]
+
+    def summarize(self, replay, layout):
+        """Play a replay through from its first tick and summarise it as one match"""
+        level = self.level(replay.metadata.get('map'))
+        level.reset()
+        level.load_state(replay.keyframes[0])
+        collector = EventCollector()
+        level.telemetry = collector
+        try:
+            inputs = replay.inputs
+            while level.tick < replay.ticks:
+                level.simulate_tick(inputs[level.tick])
+        finally:
+            level.telemetry = None
+
+        spawn = spawn_index(replay.keyframes[0], layout)
+        summarizer = EventSummarizer(layout.width, layout.height)
+        summarizer.new_match()
+        summarizer.feed(*collector.columns())
+        summarizer.end_tick[-1] = replay.ticks
+        return summarizer.summary([spawn])
+
+def spawn_index(keyframe, layout):
+    """Which of the layout's spawn points a match started on, from its first keyframe, or -1"""
+    player_state = keyframe[2]
+    tile = (player_state[0] // SUBPIXELS // TILE_SIZE, player_state[1] // SUBPIXELS // TILE_SIZE)
+    return layout.spawns.index(tile) if tile in layout.spawns else -1
+
+def telemetry_chunks(path):
+    """Yield code, tick and field arrays from a telemetry file, a bounded chunk at a time"""
+    if path.endswith('.jsonl'):
+        codes = {name: code for code, (name, _) in EVENT_FIELDS.items()}
+        causes = {name: cause for cause, name in CAUSE_NAMES.items()}
+        rows = []
+        for event in read_events(path):
+            code = codes[event['event']]
+            values = [event.get(name, 0) for name in EVENT_FIELDS[code][1]]
+            if code == PLAYER_DIED:
+                values[2] = causes.get(values[2], values[2])
+            rows.append([code, event['tick']] + values + [0] * (5 - len(values)))
+            if len(rows) == TELEMETRY_CHUNK:
+                yield split_rows(rows)
+                rows = []
+        if rows:
+            yield split_rows(rows)
+        return
+
+    with open(path, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a telemetry file")
+        while True:
+            # A record cut short by a crash is left out
+            records = np.frombuffer(f.read(TELEMETRY_CHUNK * RECORD.size), dtype=np.uint8)
+            records = records[:len(records) - len(records) % RECORD.size].view(RECORD_DTYPE)
+            if not len(records):
+                return
+            yield records['code'], records['tick'], records['fields']
+
+def split_rows(rows):
+    """Code, tick and field arrays from a list of rows"""
+    rows = np.array(rows, dtype=np.int64)
+    return rows[:, 0], rows[:, 1], rows[:, 2:]
+
+class SummaryCache:
+    """One cached summary file per input file, thrown away when the input changes"""
+    def __init__(self, directory, layout_key):
+        self.directory = directory
+        self.layout_key = layout_key
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, input_path):
+        """Cache file for an input file"""
+        key = f"{CACHE_VERSION}:{self.layout_key}:{os.path.abspath(input_path)}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.npz')
+
+    def stamp(self, input_path):
+        """Size and modification time, which change whenever the file is written"""
+        stat = os.stat(input_path)
+        return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    def load(self, input_path):
+        """Cached summary of an input file, or None if it is missing or stale"""
+        try:
+            with np.load(self.path(input_path)) as cached:
+                if not np.array_equal(cached['stamp'], self.stamp(input_path)):
+                    return None
+                return {name: cached[name] for name in cached.files if name != 'stamp'}
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def store(self, input_path, summary):
+        """Cache a summary, written to a temporary file first so an interrupted run never leaves half of one"""
+        path = self.path(input_path)
+        temporary = path + '.tmp.npz'
+        np.savez(temporary, stamp=self.stamp(input_path), **summary)
+        os.replace(temporary, path)
+
+class Aggregate:
+    """Running totals over every summarised file"""
+    def __init__(self, layout):
+        self.layout = layout
+        self.deaths = np.zeros(layout.width * layout.height, dtype=np.int64)
+        self.chains = np.zeros(0, dtype=np.int64)
+        self.detonations = 0
+        # Per-match columns, one small array per file until the report
+        self.columns = {'first_brick': [], 'died': [], 'end_tick': [], 'spawn': []}
+
+    def add(self, summary):
+        """Fold in one file's summary"""
+        self.deaths += summary['deaths']
+        chains = summary['chains']
+        if len(chains) > len(self.chains):
+            self.chains = np.pad(self.chains, (0, len(chains) - len(self.chains)))
+        self.chains[:len(chains)] += chains
+        self.detonations += int(summary['detonations'])
+        for name, parts in self.columns.items():
+            parts.append(summary[name])
+
+    def column(self, name):
+        """One per-match column across every file"""
+        return np.concatenate(self.columns[name]) if self.columns[name] else np.zeros(0, dtype=np.int64)
+
+    def results(self):
+        """The finished statistics as arrays"""
+        layout = self.layout
+        first_brick = self.column('first_brick')
+        died = self.column('died').astype(bool)
+        end_tick = self.column('end_tick')
+        spawn = self.column('spawn')
+
+        # Spawn statistics only cover matches whose spawn point is known
+        spawns = len(layout.spawns)
+        known = spawn >= 0
+        spawn_matches = np.bincount(spawn[known], minlength=spawns)
+        spawn_wins = np.bincount(spawn[known], weights=~died[known], minlength=spawns)
+        spawn_ticks = np.bincount(spawn[known], weights=end_tick[known], minlength=spawns)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            win_rate = spawn_wins / spawn_matches
+            mean_seconds = spawn_ticks / spawn_matches / TICK_RATE
+        return {
+            'matches': np.array(len(died)),
+            'death_heatmap': self.deaths.reshape(layout.height, layout.width),
+            'chain_lengths': self.chains,
+            'detonations': np.array(self.detonations),
+            'first_brick_seconds': first_brick[first_brick >= 0] / TICK_RATE,
+            'spawn_matches': spawn_matches,
+            'spawn_win_rate': win_rate,
+            'spawn_mean_seconds': mean_seconds,
+        }
+
+def find_inputs(paths):
+    """Replay and telemetry files named directly or found under directories, sorted"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.extend(os.path.join(root, name) for name in names
+                             if name.endswith(REPLAY_EXTENSIONS + TELEMETRY_EXTENSIONS))
+        else:
+            found.append(path)
+    return sorted(found)
+
+def same_map(path, other):
+    """Whether two arena paths name the same file, however each was written; None is the generated arena"""
+    if path is None or other is None:
+        return path is other
+    return os.path.abspath(path) == os.path.abspath(other)
+
+def analyze(paths, layout, cache, simulator):
+    """Summarise each input file, from the cache where possible, returning the aggregate and what was done"""
+    aggregate = Aggregate(layout)
+    counts = {'cached': 0, 'processed': 0, 'skipped': 0}
+    for path in paths:
+        summary = cache.load(path)
+        if summary is None:
+            try:
+                if path.endswith(REPLAY_EXTENSIONS):
+                    replay = read_replay(path)
+                    if not same_map(replay.metadata.get('map'), layout.map_path):
+                        # Another arena's tiles and spawns would not line up with this one's
+                        counts['skipped'] += 1
+                        continue
+                    summary = simulator.summarize(replay, layout)
+                else:
+                    summarizer = EventSummarizer(layout.width, layout.height)
+                    for chunk in telemetry_chunks(path):
+                        summarizer.feed(*chunk)
+                    summary = summarizer.summary()
+            except (OSError, ValueError) as error:
+                print(f"Skipping {path}: {error}", file=sys.stderr)
+                counts['skipped'] += 1
+                continue
+            cache.store(path, summary)
+            counts['processed'] += 1
+        else:
+            counts['cached'] += 1
+        aggregate.add(summary)
+    return aggregate, counts
+
+def format_report(results, layout):
+    """Human-readable report of the results"""
+    lines = [f"Matches: {int(results['matches'])}"]
+
+    heatmap = results['death_heatmap']
+    peak = heatmap.max()
+    lines.append(f"\nDeaths per tile ({int(heatmap.sum())} total, darkest = {int(peak)}):")
+    shades = np.zeros(heatmap.shape, dtype=np.int64) if peak == 0 else \
+        np.ceil(heatmap / peak * (len(HEAT_CHARS) - 1)).astype(np.int64)
+    walls = np.array([[tile == 1 for tile in row] for row in layout.map_data])
+    chars = np.array(list(HEAT_CHARS))[shades]
+    chars[walls & (heatmap == 0)] = '#'
+    lines.extend('  ' + ''.join(row) for row in chars)
+
+    chains = results['chain_lengths']
+    chained = int(chains.sum())
+    lines.append(f"\nChain reactions: {chained} ({int(results['detonations'])} bombs detonated)")
+    for length in np.flatnonzero(chains):
+        lines.append(f"  {length:3d} bombs  {int(chains[length]):7d}  {chains[length] / chained:6.1%}")
+
+    first_brick = results['first_brick_seconds']
+    if len(first_brick):
+        p10, p50, p90 = np.percentile(first_brick, [10, 50, 90])
+        lines.append(f"\nFirst brick cleared: median {p50:.1f} s, p10 {p10:.1f} s, p90 {p90:.1f} s "
+                     f"({len(first_brick)} matches)")
+    else:
+        lines.append("\nFirst brick cleared: no bricks destroyed")
+
+    lines.append("\nSpawn points (replays only; a win is a match the player survived):")
+    for index, (x, y) in enumerate(layout.spawns):
+        matches = int(results['spawn_matches'][index])
+        if matches:
+            lines.append(f"  spawn {index} ({x:2d},{y:2d})  {matches:6d} matches  win rate "
+                         f"{results['spawn_win_rate'][index]:6.1%}  mean length {results['spawn_mean_seconds'][index]:.1f} s")
+        else:
+            lines.append(f"  spawn {index} ({x:2d},{y:2d})  no matches")
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    input_paths = positional_arguments(('--map', '--cache', '--save'))
+    if not input_paths:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    # The layout the heatmap and spawn points refer to, generated the same way the game does unless a map is given
+    map_path = argument('--map')
+    layout = MapManager(None, map_path)
+    # Keyed like same_map compares, so every spelling of one map path shares a cache
+    cache = SummaryCache(argument('--cache', '.analytics_cache'), os.path.abspath(map_path) if map_path else 'generated')
+
+    start = time.perf_counter()
+    paths = find_inputs(input_paths)
+    aggregate, counts = analyze(paths, layout, cache, ReplaySimulator())
+    results = aggregate.results()
+    elapsed = time.perf_counter() - start
+
+    print(format_report(results, layout))
+    print(f"\n{len(paths)} files: {counts['processed']} processed, {counts['cached']} cached, "
+          f"{counts['skipped']} skipped in {elapsed:.1f} s")
+    save_path = argument('--save')
+    if save_path:
+        np.savez(save_path, **results)
+        print(f"Saved arrays to {save_path}")
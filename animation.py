@@ -0,0 +1,55 @@
+"""
+Animation - Handles frame-table animation clips and the shared animation clock
+"""
+
+import weakref
+
+class AnimationClip:
+    """A named sequence of sprite frames, each shown for a number of ticks"""
+    def __init__(self, name, frames, table, loop):
+        self.name = name
+        self.loop = loop
+
+        # Expand the (frame index, ticks) table into one entry per tick for O(1) lookup
+        self.timeline = []
+        for frame_index, ticks in table:
+            self.timeline.extend([frames[frame_index]] * ticks)
+        self.length = len(self.timeline)
+
+    def frame_at(self, elapsed_ticks):
+        """Get the frame shown a number of (possibly fractional) ticks after the clip started"""
+        elapsed_ticks = int(elapsed_ticks)
+        if self.loop:
+            return self.timeline[elapsed_ticks % self.length]
+        return self.timeline[max(0, min(elapsed_ticks, self.length - 1))]
+
+class Animation:
+    """One playing instance of a clip"""
+    __slots__ = ('clip', 'start_tick', 'frame', '__weakref__')
+
+    def __init__(self, clip, start_tick):
+        self.clip = clip
+        self.start_tick = start_tick
+        self.frame = None
+
+class AnimationClock:
+    """Shared clock that advances every playing animation in a single pass"""
+    def __init__(self, clips):
+        self.clips = clips
+        self.tick = 0
+
+        # Animations are owned by whatever shows them; dropping the owner stops them
+        self.animations = weakref.WeakSet()
+
+    def play(self, name, start_tick):
+        """Start a clip as if it began at start_tick"""
+        animation = Animation(self.clips[name], start_tick)
+        animation.frame = animation.clip.frame_at(self.tick - start_tick)
+        self.animations.add(animation)
+        return animation
+
+    def update(self, tick):
+        """Set the current frame of every playing animation; tick may be fractional"""
+        self.tick = tick
+        for animation in self.animations:
+            animation.frame = animation.clip.frame_at(tick - animation.start_tick)
\ No newline at end of file
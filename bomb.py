@@ -2,44 +2,161 @@
 Bomb - Handles bomb placement, timing, and explosion logic
 """
 
-import pygame
-import time
-from settings import TILE_SIZE, BOMB_TIMER, EXPLOSION_DURATION, EXPLOSION_RANGE
+from settings import TILE_SIZE, BOMB_FUSE_TICKS, EXPLOSION_TICKS, EXPLOSION_RANGE, BLAST_MARGIN, BOMB_SLIDE_TICKS
+from events import EventBus, BombExploded, ExplosionEnded, BrickDestroyed
+from scheduler import TimerWheel
+from map_manager import BLAST_DIRECTIONS
+import zobrist
 
 class Bomb:
-    def __init__(self, tile_x, tile_y, map_manager):
+    def __init__(self, tile_x, tile_y, map_manager, events=None, scheduler=None, blast_range=EXPLOSION_RANGE):
         self.tile_x = tile_x
         self.tile_y = tile_y
+        self.blast_range = blast_range  # Tiles the explosion reaches in each direction, from the placer's stats
         self.map_manager = map_manager
-        self.place_time = time.time()
+        self.events = events if events is not None else EventBus()
+        self.scheduler = scheduler if scheduler is not None else TimerWheel()
         self.exploded = False
-        self.explosion_start = None
+        self.chained = False  # Set off by another explosion rather than its fuse
         self.explosion_positions = []
+        self.destroyed_bricks = []  # Bricks this explosion broke, for effects
         self.finished = False  # New state to track when bomb should be removed
         
-        # Animation
-        self.animation_frame = 0
-        self.animation_timer = 0
-        self.frame_duration = 200  # milliseconds
+        # Ticks the fuse runs out and the explosion ends, fired by the scheduler
+        # The fuse burns for the placing tick too, as it always has
+        self.detonate_tick = self.scheduler.next_tick() + BOMB_FUSE_TICKS - 1
+        self.end_tick = None
+        self.fuse_timer = self.scheduler.schedule(self.detonate_tick, self.detonate)
+        self.end_timer = None
         
-    def update(self, dt):
-        """Update bomb state"""
-        current_time = time.time()
+        # Kicked bombs slide a tile every BOMB_SLIDE_TICKS until something stops them
+        self.slide = None  # (dx, dy) while sliding
+        self.slide_tick = None
+        self.slide_timer = None
         
+        # Playing animation, visual only and not part of the saved state
+        self.animation = None
+        
+        # Block the tile for movement until the bomb explodes
+        self.map_manager.set_bomb(tile_x, tile_y, True)
+        
+        # This bomb's share of the map's state hash, swapped out whenever the bomb changes
+        self.hash_key = 0
+        self.rehash()
+        
+    @property
+    def fuse_ticks(self):
+        """Ticks left until detonation"""
+        return self.detonate_tick - self.scheduler.tick
+    
+    @property
+    def explosion_ticks(self):
+        """Ticks left of the explosion"""
+        if self.end_tick is None:
+            return 0
+        return max(self.end_tick - self.scheduler.tick, 0)
+    
+    def detonate(self):
+        """Fuse timer callback"""
+        self.explode(self.chained)
+    
+    def set_off(self):
+        """Burn the fuse down so the bomb goes off as soon as the scheduler allows"""
+        if self.exploded:
+            return
+        self.chained = True
+        self.detonate_tick = self.scheduler.next_tick()
+        self.fuse_timer = self.scheduler.reschedule(self.fuse_timer, self.detonate_tick)
+        self.rehash()
+    
+    def kick(self, dx, dy):
+        """Start the bomb sliding away from a kicking player"""
+        if self.exploded or self.slide == (dx, dy):
+            return
+        self.slide = (dx, dy)
+        self.scheduler.cancel(self.slide_timer)
+        self.slide_tick = self.scheduler.next_tick() + BOMB_SLIDE_TICKS - 1
+        self.slide_timer = self.scheduler.schedule(self.slide_tick, self.slide_step)
+        self.rehash()
+    
+    def slide_step(self):
+        """Slide timer callback: move one tile, or stop against anything solid"""
+        dx, dy = self.slide
+        x, y = self.tile_x + dx, self.tile_y + dy
+        map_manager = self.map_manager
+        index = y * map_manager.width + x
+        if (not (0 <= x < map_manager.width and 0 <= y < map_manager.height) or
+                (map_manager.solid_mask | map_manager.bomb_mask) >> index & 1):
+            self.stop_sliding()
+            self.rehash()
+            return
+        
+        map_manager.set_bomb(self.tile_x, self.tile_y, False)
+        self.tile_x, self.tile_y = x, y
+        map_manager.set_bomb(x, y, True)
+        self.slide_tick = self.scheduler.tick + BOMB_SLIDE_TICKS
+        self.slide_timer = self.scheduler.schedule(self.slide_tick, self.slide_step)
+        self.rehash()
+        
+        # Sliding into an explosion sets it off
+        if map_manager.blast_mask >> index & 1:
+            self.set_off()
+    
+    def stop_sliding(self):
+        """Come to rest on the current tile"""
+        self.scheduler.cancel(self.slide_timer)
+        self.slide = self.slide_tick = self.slide_timer = None
+    
+    def end_explosion(self):
+        """Explosion timer callback"""
+        self.finished = True  # Signal to remove bomb
+        self.rehash()
+        self.events.publish(ExplosionEnded(self))
+    
+    def save_state(self):
+        """Capture the bomb state as an immutable tuple"""
+        return (self.tile_x, self.tile_y, self.detonate_tick, self.exploded, self.end_tick,
+                tuple(self.explosion_positions), self.finished, self.chained, self.blast_range,
+                self.slide, self.slide_tick)
+    
+    def load_state(self, state):
+        """Restore the bomb state from a tuple made by save_state and re-register its timers"""
+        (self.tile_x, self.tile_y, self.detonate_tick, self.exploded, self.end_tick,
+         explosion_positions, self.finished, self.chained, self.blast_range,
+         self.slide, self.slide_tick) = state
+        self.explosion_positions = list(explosion_positions)
+        self.map_manager.set_bomb(self.tile_x, self.tile_y, not self.exploded)
+        
+        self.scheduler.cancel(self.fuse_timer)
+        self.scheduler.cancel(self.end_timer)
+        self.scheduler.cancel(self.slide_timer)
+        self.fuse_timer = self.end_timer = self.slide_timer = None
         if not self.exploded:
-            # Check if bomb should explode
-            if current_time - self.place_time >= BOMB_TIMER / 1000.0:
-                self.explode()
-            else:
-                # Update animation
-                self.animation_timer += dt
-                if self.animation_timer >= self.frame_duration:
-                    self.animation_timer = 0
-                    self.animation_frame = (self.animation_frame + 1) % 3
-        else:
-            # Check if explosion should end
-            if current_time - self.explosion_start >= EXPLOSION_DURATION / 1000.0:
-                self.finished = True  # Signal to remove bomb
+            self.fuse_timer = self.scheduler.schedule(self.detonate_tick, self.detonate)
+            if self.slide:
+                self.slide_timer = self.scheduler.schedule(self.slide_tick, self.slide_step)
+        elif not self.finished:
+            self.end_timer = self.scheduler.schedule(self.end_tick, self.end_explosion)
+        self.rehash()
+    
+    def state_key(self):
+        """Zobrist key of everything about this bomb that affects the game from here on"""
+        if self.finished:
+            return 0
+        index = self.tile_y * self.map_manager.width + self.tile_x
+        if self.exploded:
+            return zobrist.key(zobrist.EXPLOSION, index, self.end_tick)
+        key = zobrist.key(zobrist.BOMB, index, self.detonate_tick) ^ zobrist.key(zobrist.BOMB_RANGE, index,
+                                                                                  self.blast_range)
+        if self.slide:
+            key ^= zobrist.key(zobrist.BOMB_SLIDE, index, self.slide_tick * 4 + BLAST_DIRECTIONS.index(self.slide))
+        return key
+    
+    def rehash(self):
+        """Swap this bomb's old key in the state hash for its current one"""
+        key = self.state_key()
+        self.map_manager.state_hash ^= self.hash_key ^ key
+        self.hash_key = key
     
     def is_placeable(self):
         """Check if a new bomb can be placed at this location"""
@@ -66,8 +183,7 @@ class Bomb:
             return False
             
         # Check if explosion is still active
-        current_time = time.time()
-        if current_time - self.explosion_start >= EXPLOSION_DURATION / 1000.0:
+        if self.explosion_ticks <= 0:
             return False
             
         # Calculate player's collision box
@@ -87,11 +203,10 @@ class Bomb:
             
             # Check if player collision box overlaps with explosion tile
             # Use a smaller collision area (80% of tile) to be more forgiving
-            collision_margin = TILE_SIZE * 0.1  # 10% margin on each side
-            explosion_left += collision_margin
-            explosion_right -= collision_margin
-            explosion_top += collision_margin
-            explosion_bottom -= collision_margin
+            explosion_left += BLAST_MARGIN
+            explosion_right -= BLAST_MARGIN
+            explosion_top += BLAST_MARGIN
+            explosion_bottom -= BLAST_MARGIN
             
             if (player_left < explosion_right and 
                 player_right > explosion_left and 
@@ -101,89 +216,56 @@ class Bomb:
                 
         return False
     
-    def explode(self):
-        """Trigger bomb explosion"""
+    def explode(self, chained=False):
+        """Trigger bomb explosion, chained if another explosion set it off"""
         self.exploded = True
-        self.explosion_start = time.time()
-        
-        # Calculate explosion positions
-        self.explosion_positions = []
+        self.scheduler.cancel(self.fuse_timer)
+        self.stop_sliding()
+        self.end_tick = self.scheduler.next_tick() + EXPLOSION_TICKS
+        self.end_timer = self.scheduler.schedule(self.end_tick, self.end_explosion)
+        self.map_manager.set_bomb(self.tile_x, self.tile_y, False)
+        self.rehash()
         
-        # Center explosion
-        self.explosion_positions.append((self.tile_x, self.tile_y))
-        
-        # Explosion in all 4 directions
-        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right
-        
-        for dx, dy in directions:
-            for distance in range(1, EXPLOSION_RANGE + 1):
-                x = self.tile_x + dx * distance
-                y = self.tile_y + dy * distance
-                
-                # Check if position is valid
-                if not (0 <= x < self.map_manager.map_data[0].__len__() and 
-                       0 <= y < self.map_manager.map_data.__len__()):
-                    break
-                
-                tile_type = self.map_manager.get_tile_type(x, y)
-                
-                if tile_type == 1:  # Wall - stop explosion
-                    break
-                elif tile_type == 2:  # Breakable brick - destroy and stop
-                    self.map_manager.destroy_brick(x, y)
-                    self.explosion_positions.append((x, y))
-                    break
-                else:  # Grass - continue explosion
-                    self.explosion_positions.append((x, y))
+        # Spread from the center as far as the cached reach and this bomb's range allow
+        self.explosion_positions = [(self.tile_x, self.tile_y)]
+        reaches = self.map_manager.blast_reach(self.tile_x, self.tile_y)
+        for (dx, dy), (reach, brick) in zip(BLAST_DIRECTIONS, reaches):
+            for distance in range(1, min(reach, self.blast_range) + 1):
+                self.explosion_positions.append((self.tile_x + dx * distance, self.tile_y + dy * distance))
+            
+            # A brick within range is broken and stops the blast
+            if brick and reach < self.blast_range:
+                x = self.tile_x + dx * (reach + 1)
+                y = self.tile_y + dy * (reach + 1)
+                self.map_manager.destroy_brick(x, y)
+                self.destroyed_bricks.append((x, y))
+                self.explosion_positions.append((x, y))
+                self.events.publish(BrickDestroyed(x, y, self))
         
-        # Check for chain reactions - trigger other bombs in explosion area
-        self.trigger_chain_reactions()
+        # Subscribers set off chain reactions, check for hits and play effects
+        self.events.publish(BombExploded(self, chained))
     
-    def trigger_chain_reactions(self):
-        """Trigger other bombs that are in this explosion's area"""
-        # Get all bombs from the player (we need access to the bomb list)
-        # This will be called from the level class where we have access to all bombs
-        pass
+    def animation_state(self):
+        """Clip name and ticks into it that this bomb should be showing"""
+        if self.exploded:
+            return 'explosion', EXPLOSION_TICKS - self.explosion_ticks
+        return 'bomb', BOMB_FUSE_TICKS - self.fuse_ticks
     
-    def render(self, screen, sprite_manager):
-        """Render the bomb or explosion"""
+    def collect_blits(self, blits, frame, camera=(0, 0)):
+        """Append this bomb's (sprite, position) pairs to a frame's blit sequence, relative to the camera"""
+        camera_x, camera_y = camera
         if not self.exploded:
-            # Render bomb with animation
-            bomb_sprite = sprite_manager.get_bomb_frame(self.animation_frame)
-            if bomb_sprite:
-                screen.blit(bomb_sprite, (self.tile_x * TILE_SIZE, self.tile_y * TILE_SIZE))
-            else:
-                # Fallback circle
-                center = (self.tile_x * TILE_SIZE + TILE_SIZE // 2, 
-                         self.tile_y * TILE_SIZE + TILE_SIZE // 2)
-                pygame.draw.circle(screen, (0, 0, 0), center, TILE_SIZE // 3)
-        else:
-            # Render explosion
-            current_time = time.time()
-            if self.explosion_start and current_time - self.explosion_start < EXPLOSION_DURATION / 1000.0:
-                # Calculate explosion animation frame
-                elapsed = current_time - self.explosion_start
-                frame_index = int((elapsed / (EXPLOSION_DURATION / 1000.0)) * 3)
-                frame_index = min(frame_index, 2)  # Clamp to valid range
-                
-                explosion_sprite = sprite_manager.get_explosion_frame(frame_index)
-                
-                for x, y in self.explosion_positions:
-                    if explosion_sprite:
-                        # Scale explosion sprite to 140% (40% bigger)
-                        scaled_size = int(TILE_SIZE * 1.4)
-                        scaled_sprite = pygame.transform.scale(explosion_sprite, (scaled_size, scaled_size))
-                        
-                        # Center the scaled sprite on the tile
-                        offset_x = (TILE_SIZE - scaled_size) // 2
-                        offset_y = (TILE_SIZE - scaled_size) // 2
-                        render_x = x * TILE_SIZE + offset_x
-                        render_y = y * TILE_SIZE + offset_y
-                        
-                        screen.blit(scaled_sprite, (render_x, render_y))
-                    else:
-                        # Fallback explosion - centered circle
-                        center_x = x * TILE_SIZE + TILE_SIZE // 2
-                        center_y = y * TILE_SIZE + TILE_SIZE // 2
-                        radius = int(TILE_SIZE * 0.7)  # 70% of tile size
-                        pygame.draw.circle(screen, (255, 255, 0), (center_x, center_y), radius) 
\ No newline at end of file
+            blits.append((frame, (self.tile_x * TILE_SIZE - camera_x, self.tile_y * TILE_SIZE - camera_y)))
+        elif self.explosion_ticks > 0:
+            # Center the enlarged explosion sprite on each tile
+            offset_x = (TILE_SIZE - frame.get_width()) // 2 - camera_x
+            offset_y = (TILE_SIZE - frame.get_width()) // 2 - camera_y
+            for x, y in self.explosion_positions:
+                blits.append((frame, (x * TILE_SIZE + offset_x, y * TILE_SIZE + offset_y)))
+    
+    def render(self, screen, sprite_manager, camera=(0, 0)):
+        """Render the bomb or explosion"""
+        name, elapsed = self.animation_state()
+        blits = []
+        self.collect_blits(blits, sprite_manager.get_clip(name).frame_at(elapsed), camera)
+        screen.blits(blits, doreturn=False)
\ No newline at end of file
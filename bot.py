@@ -0,0 +1,22 @@
+"""
+Bot - Handles computer-controlled input for unattended matches
+"""
+
+from player import INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_BOMB
+
+MOVES = (INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, 0)
+
+class RandomBot:
+    """Wanders in random directions and drops bombs now and then"""
+    def __init__(self, rng):
+        self.rng = rng
+        self.move = 0
+        self.hold = 0
+
+    def __call__(self, level):
+        if self.hold <= 0:
+            self.move = self.rng.choice(MOVES)
+            self.hold = self.rng.randint(5, 60)
+        self.hold -= 1
+        bomb = INPUT_BOMB if self.rng.random() < 0.01 else 0
+        return self.move | bomb
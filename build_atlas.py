@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Atlas Builder - Packs every sprite into images/atlas.png with a metadata index
+Run this after changing any image in the images folder.
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from sprite_manager import pack_atlas, save_atlas_image, save_atlas_cache, ATLAS_IMAGE, ATLAS_CACHE
+
+if __name__ == '__main__':
+    pygame.init()
+    atlas, index = pack_atlas()
+    save_atlas_image(atlas, index)
+    save_atlas_cache(atlas, index)
+    print(f"Packed {len(index)} sprites into {ATLAS_IMAGE} ({atlas.get_width()}x{atlas.get_height()}) and {ATLAS_CACHE}")
@@ -0,0 +1,13 @@
+"""
+CLI - Handles the command line flags and positional arguments of the tool scripts
+"""
+
+import sys
+
+def argument(name, default=None, kind=str):
+    """Value following a command line flag, converted by kind, or default when the flag is absent"""
+    return kind(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+def positional_arguments(flags):
+    """Command line arguments that are neither flags nor the value following one of the given flags"""
+    return [arg for i, arg in enumerate(sys.argv[1:], 1) if not arg.startswith('--') and sys.argv[i - 1] not in flags]
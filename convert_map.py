@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Map Converter - Converts arenas between the binary and text map formats
+Usage: python convert_map.py SOURCE DEST
+SOURCE is a map file, or "classic" for the built-in arena. DEST is written as text if it ends in .txt.
+"""
+
+import sys
+from map_manager import MapManager
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print(__doc__.strip())
+        sys.exit(1)
+    source, dest = sys.argv[1:]
+    map_manager = MapManager(None, None if source == 'classic' else source)
+    map_manager.save_map(dest)
+    print(f"Wrote {map_manager.width}x{map_manager.height} map with {len(map_manager.spawns)} spawns to {dest}")
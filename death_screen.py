@@ -4,6 +4,7 @@ Death Screen - Shows when player dies and provides restart/exit options
 
 import pygame
 from settings import *
+from overlay import FrozenBackground
 
 class DeathScreen:
     def __init__(self, display_surface, game_state_manager):
@@ -23,11 +24,40 @@ class DeathScreen:
         self.show_menu = False
         self.menu_delay = 1.5  # Show menu after x seconds
         
+        # Text never changes, so render it once
+        self.death_text = self.title_font.render("YOU DIED", True, (255, 0, 0))
+        self.death_rect = self.death_text.get_rect(center=(DISPLAY_WIDTH // 2, DISPLAY_HEIGHT // 2 - 100))
+        
+        # (normal, selected) text per option, and the selection indicator next to each
+        self.option_texts = [
+            (self.menu_font.render(option, True, (255, 255, 255)), self.menu_font.render(option, True, (255, 255, 0)))
+            for option in self.options
+        ]
+        self.option_rects = [
+            texts[0].get_rect(center=(DISPLAY_WIDTH // 2, DISPLAY_HEIGHT // 2 + 50 + i * 60))
+            for i, texts in enumerate(self.option_texts)
+        ]
+        self.indicator = self.menu_font.render(">", True, (255, 255, 0))
+        self.indicator_rects = [
+            self.indicator.get_rect(center=(DISPLAY_WIDTH // 2 - 100, DISPLAY_HEIGHT // 2 + 50 + i * 60))
+            for i in range(len(self.options))
+        ]
+        
+        # The game frame at the moment of death, frozen and darkened
+        self.background = FrozenBackground(display_surface, 180)
+        self.drawn_option = None  # Selection currently on screen, None until the menu is drawn
+        
     def start_death_sequence(self):
         """Start the death sequence"""
         self.death_time = pygame.time.get_ticks()
         self.show_menu = False
         self.selected_option = 0
+        self.background.release()
+        self.drawn_option = None
+    
+    def is_frozen(self):
+        """Check if the game frame has been captured, so the level no longer needs drawing"""
+        return self.background.is_captured()
         
     def handle_input(self, events):
         """Handle input for death screen"""
@@ -64,29 +94,28 @@ class DeathScreen:
             self.show_menu = True
             
     def draw(self):
-        """Draw the death screen"""
-        # Dark overlay
-        overlay = pygame.Surface((DISPLAY_WIDTH, DISPLAY_HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        self.display_surface.blit(overlay, (0, 0))
+        """Draw the death screen over the frozen game frame, returning the areas of the display that changed"""
+        dirty = []
+        if not self.background.is_captured():
+            # First frame: freeze what the level just drew
+            self.background.capture()
+            dirty.append(self.background.draw())
+            self.display_surface.blit(self.death_text, self.death_rect)
+        
+        # Show menu after delay, redrawing only when the selection moves
+        if not self.show_menu or self.drawn_option == self.selected_option:
+            return dirty
         
-        # Death message
-        death_text = self.title_font.render("YOU DIED", True, (255, 0, 0))
-        death_rect = death_text.get_rect(center=(DISPLAY_WIDTH // 2, DISPLAY_HEIGHT // 2 - 100))
-        self.display_surface.blit(death_text, death_rect)
+        if self.drawn_option is None:
+            changed = range(len(self.options))
+        else:
+            changed = (self.drawn_option, self.selected_option)
+            dirty.append(self.background.restore(self.indicator_rects[self.drawn_option]))
         
-        # Show menu after delay
-        if self.show_menu:
-            # Draw menu options
-            for i, option in enumerate(self.options):
-                color = (255, 255, 0) if i == self.selected_option else (255, 255, 255)
-                text = self.menu_font.render(option, True, color)
-                rect = text.get_rect(center=(DISPLAY_WIDTH // 2, DISPLAY_HEIGHT // 2 + 50 + i * 60))
-                self.display_surface.blit(text, rect)
-                
-            # Draw selection indicator
-            if self.selected_option < len(self.options):
-                indicator = self.menu_font.render(">", True, (255, 255, 0))
-                indicator_rect = indicator.get_rect(center=(DISPLAY_WIDTH // 2 - 100, DISPLAY_HEIGHT // 2 + 50 + self.selected_option * 60))
-                self.display_surface.blit(indicator, indicator_rect) 
\ No newline at end of file
+        for i in changed:
+            dirty.append(self.background.restore(self.option_rects[i]))
+            self.display_surface.blit(self.option_texts[i][i == self.selected_option], self.option_rects[i])
+        dirty.append(self.indicator_rects[self.selected_option])
+        self.display_surface.blit(self.indicator, self.indicator_rects[self.selected_option])
+        self.drawn_option = self.selected_option
+        return dirty
@@ -0,0 +1,207 @@
+"""
+Environment - Handles headless games with a reset/step interface for training agents
+
+Observations are float32 planes of shape (CHANNELS, height, width):
+    0  tiles       0 = grass, 1 = wall, 2 = brick
+    1  bomb fuse   fraction of the fuse left on each unexploded bomb, 0 elsewhere
+    2  blast       1 on tiles covered by an active explosion
+    3  player      1 on the player's tile
+    4  power-up    (kind + 1) / kinds on tiles with a dropped power-up, 0 elsewhere
+plus the player's (x, y) position in tiles and stat row (bombs, range, speed, kick), which power-ups raise.
+"""
+
+import os
+import numpy as np
+import pygame
+from settings import DISPLAY_WIDTH, DISPLAY_HEIGHT, TILE_SIZE, TICK_RATE, BOMB_FUSE_TICKS
+from game_state_manager import GameStateManager
+from sprite_manager import SpriteManager
+from level import Level
+from player import INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_BOMB
+from events import BrickDestroyed, PlayerKilled
+from powerups import POWERUPS, STAT_COLUMNS
+
+# Discrete action -> input bits
+ACTIONS = (0, INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_BOMB)
+
+CHANNELS = 5
+TILES, BOMB_FUSE, BLAST, PLAYER, POWERUP = range(CHANNELS)
+
+# Rewards
+BRICK_REWARD = 1.0
+DEATH_REWARD = -10.0
+
+# Episodes are cut off after a minute of game time
+MAX_EPISODE_TICKS = 60 * TICK_RATE
+
+def init_headless():
+    """Set up pygame without a window so levels can be built, returning the display surface"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    return pygame.display.get_surface()
+
+class BombermanEnv:
+    """One headless game, stepped a fixed number of ticks per action"""
+    def __init__(self, map_path=None, frame_skip=1, max_ticks=MAX_EPISODE_TICKS, sprite_manager=None):
+        surface = init_headless()
+        self.sprite_manager = sprite_manager or SpriteManager()
+        self.level = Level(surface, GameStateManager('level'), pygame.time.Clock(), self.sprite_manager, map_path)
+        self.level.effects = False
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+
+        map_manager = self.level.map_manager
+        self.width = map_manager.width
+        self.height = map_manager.height
+        self.blast_bytes = (self.width * self.height + 7) // 8
+
+        # Written in place every step; VectorEnv swaps these for views into its stacked arrays
+        self.observation = np.zeros((CHANNELS, self.height, self.width), dtype=np.float32)
+        self.position = np.zeros(2, dtype=np.float32)
+        self.stats = np.zeros(len(STAT_COLUMNS), dtype=np.float32)
+        self.powerup_indices = np.zeros(0, dtype=np.intp)  # Tiles set in the power-up plane
+
+        self.rng = np.random.default_rng()
+        self.reward = 0.0
+        self.player_tile = None
+
+    def reset(self, seed=None):
+        """Start a new episode from a random spawn point, returning (observation, info)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        level = self.level
+        # Power-ups are hidden at reset, so seed their placement too
+        level.map_manager.rng.seed(int(self.rng.integers(2 ** 32)))
+        level.reset(int(self.rng.integers(len(level.map_manager.spawns))))
+
+        # The level makes a new event bus on reset
+        level.events.subscribe(BrickDestroyed, self.on_brick_destroyed)
+        level.events.subscribe(PlayerKilled, self.on_player_killed)
+
+        # Tiles only change when bricks break, so copy the grid once and patch it from events
+        self.observation.fill(0)
+        tiles = np.frombuffer(b''.join(level.map_manager.map_data), dtype=np.uint8)
+        self.observation[TILES] = tiles.reshape(self.height, self.width)
+        self.player_tile = None
+        self.powerup_indices = np.zeros(0, dtype=np.intp)
+        self.observe()
+        return self.observation, {}
+
+    def step(self, action):
+        """Apply one action, returning (observation, reward, terminated, truncated, info)"""
+        level = self.level
+        input_bits = ACTIONS[action]
+        self.reward = 0.0
+        for _ in range(self.frame_skip):
+            level.simulate_tick(input_bits)
+            input_bits &= ~INPUT_BOMB  # One bomb per action
+            if level.player_dead:
+                break
+
+        self.observe()
+        terminated = level.player_dead
+        truncated = not terminated and level.tick >= self.max_ticks
+        return self.observation, self.reward, terminated, truncated, {'tick': level.tick}
+
+    def on_brick_destroyed(self, event):
+        """Reward the break and clear the tile in the observation"""
+        self.reward += BRICK_REWARD
+        self.observation[TILES, event.y, event.x] = 0
+
+    def on_player_killed(self, event):
+        """Penalise the death"""
+        self.reward += DEATH_REWARD
+
+    def observe(self):
+        """Refresh the planes that change every tick"""
+        level = self.level
+        observation = self.observation
+
+        fuse = observation[BOMB_FUSE]
+        fuse.fill(0)
+        for bomb in level.player.bombs:
+            if not bomb.exploded:
+                fuse[bomb.tile_y, bomb.tile_x] = bomb.fuse_ticks / BOMB_FUSE_TICKS
+
+        # Unpack the blast bitmask straight into the plane
+        blast_mask = level.map_manager.blast_mask
+        if blast_mask:
+            packed = np.frombuffer(blast_mask.to_bytes(self.blast_bytes, 'little'), dtype=np.uint8)
+            bits = np.unpackbits(packed, count=self.width * self.height, bitorder='little')
+            observation[BLAST] = bits.reshape(self.height, self.width)
+        else:
+            observation[BLAST].fill(0)
+
+        x, y = level.player.x / TILE_SIZE, level.player.y / TILE_SIZE
+        self.position[:] = (x, y)
+        tile = (int(y), int(x))
+        if tile != self.player_tile:
+            if self.player_tile is not None:
+                observation[PLAYER][self.player_tile] = 0
+            observation[PLAYER][tile] = 1
+            self.player_tile = tile
+
+        # Only a handful of power-ups lie around at once, so clear and set them from the sparse index
+        powerups = level.map_manager.powerups
+        plane = observation[POWERUP].reshape(-1)
+        plane[self.powerup_indices] = 0
+        self.powerup_indices = np.fromiter(powerups, dtype=np.intp, count=len(powerups))
+        kinds = np.fromiter(powerups.values(), dtype=np.float32, count=len(powerups))
+        plane[self.powerup_indices] = (kinds + 1) / len(POWERUPS)
+
+        stats = level.stats
+        index = level.player.index
+        for column, name in enumerate(STAT_COLUMNS):
+            self.stats[column] = getattr(stats, name)[index]
+
+class VectorEnv:
+    """Several games stepped in lockstep, with observations stacked in one array"""
+    def __init__(self, num_envs, **kwargs):
+        # Sprites are only needed to build levels, so every game shares one set
+        sprite_manager = kwargs.pop('sprite_manager', None)
+        if sprite_manager is None:
+            init_headless()
+            sprite_manager = SpriteManager()
+        self.envs = [BombermanEnv(sprite_manager=sprite_manager, **kwargs) for _ in range(num_envs)]
+        self.num_envs = num_envs
+
+        height, width = self.envs[0].height, self.envs[0].width
+        self.observations = np.zeros((num_envs, CHANNELS, height, width), dtype=np.float32)
+        self.positions = np.zeros((num_envs, 2), dtype=np.float32)
+        self.stats = np.zeros((num_envs, len(STAT_COLUMNS)), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        # Last observation of each game that finished this step, before the reset overwrote it
+        self.final_observations = np.zeros_like(self.observations)
+        self.finished = np.zeros(num_envs, dtype=bool)
+
+        # Each game writes straight into its slice of the stacked arrays
+        for i, env in enumerate(self.envs):
+            env.observation = self.observations[i]
+            env.position = self.positions[i]
+            env.stats = self.stats[i]
+
+    def reset(self, seed=None):
+        """Reset every game, seeding game i with seed + i, returning (observations, info)"""
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i)
+        return self.observations, {'positions': self.positions, 'stats': self.stats}
+
+    def step(self, actions):
+        """Step every game, resetting finished ones; the returned arrays are reused by the next step"""
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            _, reward, terminated, truncated, _ = env.step(int(action))
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            self.finished[i] = terminated or truncated
+            if self.finished[i]:
+                # Kept for bootstrapping on truncation, as the reset below overwrites the game's slice
+                self.final_observations[i] = self.observations[i]
+                env.reset()
+        return (self.observations, self.rewards, self.terminated, self.truncated,
+                {'positions': self.positions, 'stats': self.stats,
+                 'final_observation': self.final_observations, '_final_observation': self.finished})
@@ -0,0 +1,40 @@
+"""
+Events - Handles the synchronous game event bus and the events sent over it
+"""
+
+from collections import namedtuple
+
+# A bomb was put down by a player
+BombPlaced = namedtuple('BombPlaced', 'bomb')
+
+# A bomb detonated; chained is True when another explosion set it off
+BombExploded = namedtuple('BombExploded', 'bomb chained')
+
+# A bomb's explosion finished and the bomb can be removed
+ExplosionEnded = namedtuple('ExplosionEnded', 'bomb')
+
+# An explosion broke a brick at (x, y)
+BrickDestroyed = namedtuple('BrickDestroyed', 'x y bomb')
+
+# A player was caught in an explosion
+PlayerKilled = namedtuple('PlayerKilled', 'player bomb')
+
+class EventBus:
+    """Delivers each published event straight away to the handlers subscribed to its type"""
+    def __init__(self):
+        self.handlers = {}  # event type -> list of handlers
+
+    def subscribe(self, event_type, handler):
+        """Call a handler whenever an event of the given type is published"""
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        """Stop calling a handler for an event type"""
+        handlers = self.handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event):
+        """Call every handler for the event's type, in subscription order"""
+        for handler in self.handlers.get(type(event), ()):
+            handler(event)
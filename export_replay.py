@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Replay Exporter - Renders a recorded match offscreen to a PNG sequence or raw RGB frame stream
+Usage: python export_replay.py REPLAY OUTPUT [--fps N] [--workers N] [--start SECONDS] [--end SECONDS]
+OUTPUT ending in .rgb or .raw is written as raw 24-bit frames; anything else is a directory of PNGs.
+The match is split at its keyframes and the segments are rendered in parallel, one process per core.
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import sys
+import time
+import zlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pygame
+from settings import DISPLAY_WIDTH, DISPLAY_HEIGHT, TICK_RATE, TICK_MS
+from replay import read_replay
+from cli import argument, positional_arguments
+
+# Particles live up to 1.2 s, so segments start simulating effects this far back to pick up earlier explosions
+PARTICLE_PREROLL = int(1.5 * TICK_RATE)  # ticks
+
+RAW_EXTENSIONS = ('.rgb', '.raw')
+FRAME_BYTES = DISPLAY_WIDTH * DISPLAY_HEIGHT * 3
+
+# Each worker process builds its own display, sprites and level once
+worker = None
+
+class SegmentRenderer:
+    """One worker's headless display and level, rendering frame ranges of one replay"""
+    def __init__(self, replay_path, output, fps, clip_start=0):
+        # Imported here so the parent process never touches the display
+        from environment import init_headless
+        from game_state_manager import GameStateManager
+        from sprite_manager import SpriteManager
+        from level import Level
+
+        self.replay = read_replay(replay_path)
+        self.seed = zlib.crc32(self.replay.inputs)  # Particle seed shared by every worker rendering this replay
+        self.output = output
+        self.fps = fps
+        self.clip_start = clip_start  # Frame written first, at the start of the output
+        self.raw = output.endswith(RAW_EXTENSIONS)
+        self.surface = init_headless()
+        self.sprite_manager = SpriteManager()
+        self.level = Level(self.surface, GameStateManager('level'), pygame.time.Clock(), self.sprite_manager,
+                           self.replay.metadata.get('map'))
+
+    def frame_tick(self, frame):
+        """First tick at or after a frame's point in time"""
+        return -(-frame * TICK_RATE // self.fps)
+
+    def render(self, start_frame, end_frame):
+        """Render frames [start_frame, end_frame) and write them out, returning how many were written"""
+        level = self.level
+        inputs = self.replay.inputs
+
+        # Start from the last keyframe before the preroll, with a fresh level
+        preroll_tick = max(self.frame_tick(start_frame) - PARTICLE_PREROLL, 0)
+        keyframe = self.replay.keyframe_before(preroll_tick)
+        level.reset()
+        level.load_state(self.replay.keyframes[keyframe])
+        # Particles are cosmetic and unseeded in play; seed them per segment so every export is identical
+        level.particles.rng = np.random.default_rng((self.seed, start_frame))
+        if level.player_dead:
+            # Died before this segment, so the death screen freezes the first frame drawn
+            level.death_screen.start_death_sequence()
+
+        # Catch up to the preroll without effects, then run frame by frame so particles match the frame rate
+        level.effects = False
+        while level.tick < preroll_tick:
+            level.simulate_tick(inputs[level.tick])
+        level.effects = True
+        first_frame = preroll_tick * self.fps // TICK_RATE
+
+        raw_file = open(self.output, 'r+b') if self.raw else None
+        try:
+            if raw_file:
+                raw_file.seek((start_frame - self.clip_start) * FRAME_BYTES)
+            for frame in range(first_frame, end_frame):
+                target = min(self.frame_tick(frame), len(inputs))
+                while level.tick < target:
+                    level.simulate_tick(inputs[level.tick])
+                level.particles.update(1 / self.fps, *level.arena_size())
+
+                # Interpolate between ticks exactly as the game does between frames
+                alpha = 1 - (level.tick - frame * TICK_RATE / self.fps)
+                level.accumulator = min(max(alpha, 0), 1) * TICK_MS
+                if frame < start_frame:
+                    # A death during the preroll still freezes the frame it happened on
+                    if level.player_dead and not level.death_screen.is_frozen():
+                        level.draw()
+                    continue
+                level.draw()
+                if raw_file:
+                    raw_file.write(pygame.image.tobytes(self.surface, 'RGB'))
+                else:
+                    pygame.image.save(self.surface, os.path.join(self.output, f"frame_{frame - self.clip_start:06d}.png"))
+        finally:
+            if raw_file:
+                raw_file.close()
+        return end_frame - start_frame
+
+def init_worker(replay_path, output, fps, clip_start):
+    """Process pool initializer"""
+    global worker
+    worker = SegmentRenderer(replay_path, output, fps, clip_start)
+
+def render_segment(segment):
+    """Process pool task"""
+    return worker.render(*segment)
+
+def split_segments(replay, fps, start_frame, end_frame):
+    """Split a frame range at the replay's keyframes"""
+    bounds = [tick * fps // TICK_RATE for tick in replay.keyframe_ticks]
+    bounds = sorted({start_frame, end_frame} | {bound for bound in bounds if start_frame < bound < end_frame})
+    return list(zip(bounds, bounds[1:]))
+
+def warm_asset_cache():
+    """Build the sprite atlas cache once, so workers read it instead of racing to write it"""
+    from environment import init_headless
+    from sprite_manager import SpriteManager
+    init_headless()
+    SpriteManager()
+    pygame.quit()
+
+if __name__ == '__main__':
+    paths = positional_arguments(('--fps', '--workers', '--start', '--end'))
+    if len(paths) != 2:
+        print(__doc__.strip())
+        sys.exit(1)
+    replay_path, output = paths
+    fps = argument('--fps', TICK_RATE, int)
+    workers = argument('--workers', os.cpu_count() or 1, int)
+
+    replay = read_replay(replay_path)
+    total_frames = replay.ticks * fps // TICK_RATE + 1
+    start_frame = min(int(argument('--start', 0, float) * fps), total_frames)
+    end_frame = min(int(argument('--end', total_frames / fps, float) * fps), total_frames)
+    segments = split_segments(replay, fps, start_frame, end_frame)
+
+    if output.endswith(RAW_EXTENSIONS):
+        # Sized up front so every worker can write its frames in place
+        with open(output, 'wb') as f:
+            f.truncate((end_frame - start_frame) * FRAME_BYTES)
+    else:
+        os.makedirs(output, exist_ok=True)
+    warm_asset_cache()
+
+    start = time.perf_counter()
+    # Fresh interpreters, so no worker inherits another's SDL state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, context, init_worker, (replay_path, output, fps, start_frame)) as pool:
+        frames = sum(pool.map(render_segment, segments))
+    elapsed = time.perf_counter() - start
+
+    clip_seconds = frames / fps
+    print(f"Rendered {frames} frames ({clip_seconds:.1f} s of play) in {elapsed:.1f} s, "
+          f"{clip_seconds / elapsed:.1f}x real time with {workers} workers")
+    if output.endswith(RAW_EXTENSIONS):
+        print(f"Encode with: ffmpeg -f rawvideo -pix_fmt rgb24 -s {DISPLAY_WIDTH}x{DISPLAY_HEIGHT} -r {fps} -i {output} clip.mp4")
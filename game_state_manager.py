@@ -2,6 +2,10 @@ class GameStateManager:
     def __init__(self, initial_state='main_menu'):
         self.state = initial_state
         self.reset_requested = False
+        
+        # Scenes are built by their factory the first time they are needed
+        self.scene_factories = {}
+        self.scenes = {}
 
     def get_state(self):
         return self.state
@@ -16,4 +20,16 @@ class GameStateManager:
         self.reset_requested = True
 
     def clear_reset_request(self):
-        self.reset_requested = False 
\ No newline at end of file
+        self.reset_requested = False
+
+    def register_scene(self, name, factory):
+        self.scene_factories[name] = factory
+
+    def has_scene(self, name):
+        return name in self.scenes
+
+    def get_scene(self, name=None):
+        name = name or self.state
+        if name not in self.scenes:
+            self.scenes[name] = self.scene_factories[name]()
+        return self.scenes[name]
\ No newline at end of file
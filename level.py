@@ -1,33 +1,82 @@
 import pygame
+import time
 from settings import *
 from sprite_manager import SpriteManager
 from map_manager import MapManager
-from player import Player
+from player import Player, read_input, INPUT_BOMB
 from bomb import Bomb
 from death_screen import DeathScreen
+from particles import ParticleSystem
+from animation import AnimationClock
+from events import EventBus, BombPlaced, BombExploded, BrickDestroyed, PlayerKilled
+from scheduler import TimerWheel
+from powerups import PlayerStats, render_icons
+import zobrist
+from telemetry import BOMB_PLACED, BOMB_DETONATED, CHAIN_REACTION, BRICKS_DESTROYED, PLAYER_DIED, CAUSE_EXPLOSION
 
 class Level:
-    def __init__(self, display_surface, game_state_manager, clock):
+    def __init__(self, display_surface, game_state_manager, clock, sprite_manager=None, map_path=None):
         self.display_surface = display_surface
         self.game_state_manager = game_state_manager
         self.clock = clock
         
         # Initialize game components
-        self.sprite_manager = SpriteManager()
-        self.map_manager = MapManager(self.sprite_manager)
+        self.sprite_manager = sprite_manager or SpriteManager()
+        self.sprite_manager.wait_until_loaded()
+        self.map_manager = MapManager(self.sprite_manager, map_path)
         
-        # Create player (start in top-left corner)
-        self.player = Player(1, 1, self.sprite_manager, self.map_manager)
+        # Game events, with the level reacting to bombs and deaths as they happen
+        self.events = EventBus()
+        self.subscribe_events()
+        
+        # Fuse and explosion timers, advanced once per tick
+        self.scheduler = TimerWheel()
+        
+        # Stat columns for every player, raised by power-ups
+        self.stats = PlayerStats()
+        
+        # Create player at the map's first spawn point
+        self.player = Player(*self.map_manager.spawns[0], self.sprite_manager, self.map_manager,
+                             self.events, self.scheduler, self.stats)
         
         # Game state
         self.running = True
         self.player_dead = False
         
+        # Fixed-rate simulation
+        self.tick = 0
+        self.accumulator = 0
+        self.bomb_requested = False
+        self.session = None  # RollbackSession when playing online
+        self.resimulating = False  # Set during rollback so effects are not replayed
+        self.chain_triggered = 0  # Bombs set off by other explosions this tick
+        self.telemetry = None  # Telemetry stream when enabled
+        self.input_source = None  # Callable returning input bits in place of the keyboard, e.g. a bot
+        self.recorder = None  # ReplayRecorder when recording matches
+        
+        # Visual effects, outside the simulation state
+        self.particles = ParticleSystem()
+        self.camera = (0, 0)  # Pixel position of the screen's top-left corner in the arena, set each frame
+        self.effects = True  # Emit particles; off when nothing is drawn, e.g. training
+        self.animation_clock = AnimationClock(self.sprite_manager.clips)
+        
         # Death screen
         self.death_screen = DeathScreen(display_surface, game_state_manager)
         
         # Font for UI
         self.font = pygame.font.Font(None, FONT_SIZE)
+        
+        # Controls info never changes, so render it once
+        controls = [
+            "WASD/Arrow Keys: Move",
+            "Space: Place Bomb",
+            "ESC: Pause"
+        ]
+        self.control_texts = [self.font.render(control, True, WHITE) for control in controls]
+        self.powerup_icons = render_icons(TILE_SIZE)
+        
+        # Blit sequence reused every frame for batched bomb drawing
+        self.bomb_blits = []
 
     def handle_input(self, events):
         """Handle pygame events"""
@@ -38,46 +87,193 @@ class Level:
         for event in events:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    self.player.place_bomb()
+                    self.bomb_requested = True
     
-    def handle_movement(self):
-        """Handle continuous movement input"""
+    def read_input(self):
+        """Encode this tick's local input, consuming any pending bomb request"""
+        if self.input_source:
+            input_bits = self.input_source(self)
+        else:
+            input_bits = read_input(pygame.key.get_pressed())
+        if self.bomb_requested:
+            input_bits |= INPUT_BOMB
+            self.bomb_requested = False
+        return input_bits
+
+    def simulate_tick(self, input_bits):
+        """Advance the simulation by one fixed tick without rendering"""
+        # Recorded during rollback too, so corrected inputs replace predicted ones
+        if self.recorder:
+            self.recorder.record(self, input_bits)
+        self.tick += 1
+        self.chain_triggered = 0
+        self.player.store_previous_position()
         if self.player_dead:
             return
-            
-        keys = pygame.key.get_pressed()
-        self.player.handle_input(keys)
+        
+        # Place bomb before moving, as the keypress happened first
+        if input_bits & INPUT_BOMB:
+            self.player.place_bomb()
+        
+        # Handle movement
+        self.player.apply_input(input_bits)
         self.player.move()
+        
+        # Fire the fuses and explosion ends due this tick
+        self.scheduler.advance(self.tick)
+        
+        # Check for player death
+        self.check_player_death()
+        
+        if self.telemetry and self.chain_triggered and not self.resimulating:
+            self.telemetry.emit(CHAIN_REACTION, self.tick, self.chain_triggered + 1)
+
+    def subscribe_events(self):
+        """Hook the level's reactions up to the event bus"""
+        self.events.subscribe(BombPlaced, self.on_bomb_placed)
+        self.events.subscribe(BombExploded, self.on_bomb_exploded)
+        self.events.subscribe(BrickDestroyed, self.on_brick_destroyed)
+        self.events.subscribe(PlayerKilled, self.on_player_killed)
+
+    def on_bomb_placed(self, event):
+        """Record the bomb, setting it off at once if it was dropped into an explosion"""
+        bomb = event.bomb
+        if self.telemetry and not self.resimulating:
+            self.telemetry.emit(BOMB_PLACED, self.tick, bomb.tile_x, bomb.tile_y)
+        if self.map_manager.blast_mask >> (bomb.tile_y * self.map_manager.width + bomb.tile_x) & 1:
+            bomb.set_off()
+
+    def on_bomb_exploded(self, event):
+        """Set off bombs caught in the blast and play the explosion's effects"""
+        bomb = event.bomb
+        if event.chained:
+            self.chain_triggered += 1
+        
+        if not self.resimulating:
+            if self.effects:
+                for x, y in bomb.explosion_positions:
+                    self.particles.emit_explosion(x, y)
+            if self.telemetry:
+                self.telemetry.emit(BOMB_DETONATED, self.tick, bomb.tile_x, bomb.tile_y, len(bomb.explosion_positions))
+                if bomb.destroyed_bricks:
+                    self.telemetry.emit(BRICKS_DESTROYED, self.tick, bomb.tile_x, bomb.tile_y, len(bomb.destroyed_bricks))
+        
+        # Only tiles flagged in the bomb mask can hold an unexploded bomb
+        width = self.map_manager.width
+        for x, y in bomb.explosion_positions:
+            if self.map_manager.bomb_mask >> (y * width + x) & 1:
+                for other_bomb in self.player.bombs:
+                    if not other_bomb.exploded and other_bomb.tile_x == x and other_bomb.tile_y == y:
+                        other_bomb.set_off()
+
+    def on_brick_destroyed(self, event):
+        """Throw debris from a broken brick"""
+        if self.effects and not self.resimulating:
+            self.particles.emit_debris(event.x, event.y)
+
+    def on_player_killed(self, event):
+        """End the round for the player"""
+        self.player_dead = True
+        self.map_manager.state_hash ^= zobrist.key(zobrist.PLAYER_DEAD, self.player.index)
+        self.death_screen.start_death_sequence()
+        if self.telemetry and not self.resimulating:
+            tile_x, tile_y = event.player.get_grid_position()
+            self.telemetry.emit(PLAYER_DIED, self.tick, tile_x, tile_y, CAUSE_EXPLOSION, event.bomb.tile_x, event.bomb.tile_y)
 
     def update(self, dt):
-        """Update game state"""
+        """Run as many fixed simulation ticks as the elapsed time allows"""
         if self.player_dead:
             self.death_screen.update()
-            return
-            
-        # Update player bombs
-        self.player.update_bombs(dt)
         
-        # Check for player death
-        self.check_player_death()
+        self.accumulator += dt
+        steps = 0
+        while self.accumulator >= TICK_MS:
+            self.accumulator -= TICK_MS
+            steps += 1
+            if steps > MAX_CATCHUP_TICKS:
+                # Too far behind - drop the backlog instead of spiralling
+                self.accumulator = 0
+                break
+            
+            input_bits = self.read_input() if not self.player_dead else 0
+            tick_start = time.perf_counter()
+            if self.session:
+                self.session.advance(input_bits)
+            else:
+                self.simulate_tick(input_bits)
+            if self.telemetry:
+                self.telemetry.record_tick_time(self.tick, time.perf_counter() - tick_start)
         
-        # Check for chain reactions
-        self.check_chain_reactions()
+        self.particles.update(dt / 1000, *self.arena_size())
+
+    def save_state(self):
+        """Capture the full simulation state for rollback"""
+        return (self.tick, self.player_dead, self.player.save_state(), self.map_manager.save_state(),
+                self.stats.save_state())
+
+    def load_state(self, state):
+        """Restore the simulation state from a snapshot made by save_state"""
+        self.tick, self.player_dead, player_state, map_state, stats_state = state
+        self.stats.load_state(stats_state)
+        self.scheduler.reset(self.tick)
+        self.player.load_state(player_state)
+        # Restores the state hash the player's and bombs' keys were already part of
+        self.map_manager.load_state(map_state)
+    
+    @property
+    def state_hash(self):
+        """64-bit Zobrist hash of the simulation state, equal on every peer and replay that is in sync"""
+        return self.map_manager.state_hash
+    
+    def rehash(self):
+        """Put the player's and bombs' keys into a state hash the map has just rebuilt from scratch"""
+        for item in [self.player] + self.player.bombs:
+            item.hash_key = 0
+            item.rehash()
+        if self.player_dead:
+            self.map_manager.state_hash ^= zobrist.key(zobrist.PLAYER_DEAD, self.player.index)
+    
+    def compute_state_hash(self):
+        """The state hash worked out from scratch, to check the incremental one against"""
+        state_hash = self.map_manager.hash_map() ^ self.player.state_key()
+        for bomb in self.player.bombs:
+            state_hash ^= bomb.state_key()
+        if self.player_dead:
+            state_hash ^= zobrist.key(zobrist.PLAYER_DEAD, self.player.index)
+        return state_hash
 
     def draw(self):
-        """Render everything to screen"""
+        """Render everything to screen, interpolated between the last two ticks"""
+        # After death the frame is frozen under the death screen, which redraws only what changes
+        if self.player_dead and self.death_screen.is_frozen():
+            return self.death_screen.draw()
+        
+        # How far the frame is between the previous tick and the next one
+        alpha = min(self.accumulator / TICK_MS, 1.0)
+        
+        # Advance every animation once for this frame, on the same timeline as the player
+        self.animation_clock.update(self.tick - 1 + alpha)
+        
+        # Arenas bigger than the screen scroll to keep the player in view
+        self.camera = self.camera_position(alpha)
+        
         # Clear screen
         self.display_surface.fill(BLACK)
         
         # Render map
-        self.map_manager.render(self.display_surface)
+        self.map_manager.render(self.display_surface, self.camera)
         
-        # Render player bombs
-        for bomb in self.player.bombs:
-            bomb.render(self.display_surface, self.sprite_manager)
+        # Render dropped power-ups
+        self.draw_powerups()
+        
+        # Render player bombs and explosions in one batch
+        self.draw_bombs()
+        
+        # Render sparks, smoke and debris
+        self.particles.draw(self.display_surface, self.camera)
         
         # Render player
-        self.player.render(self.display_surface)
+        self.player.render(self.display_surface, alpha, self.camera)
         
         # Draw UI
         self.draw_ui()
@@ -86,23 +282,69 @@ class Level:
         if self.player_dead:
             self.death_screen.draw()
 
+    def draw_bombs(self):
+        """Draw every bomb and explosion tile with a single batched blit call"""
+        blits = self.bomb_blits
+        blits.clear()
+        for bomb in self.player.bombs:
+            # Bombs switch clip when they explode, or are new after a rollback
+            name, elapsed = bomb.animation_state()
+            if bomb.animation is None or bomb.animation.clip.name != name:
+                bomb.animation = self.animation_clock.play(name, self.tick - elapsed)
+            bomb.collect_blits(blits, bomb.animation.frame, self.camera)
+        if not blits:
+            return
+        if hasattr(self.display_surface, 'fblits'):
+            # pygame-ce fast path that skips building the dirty rect list
+            self.display_surface.fblits(blits)
+        else:
+            self.display_surface.blits(blits, doreturn=False)
+
+    def draw_powerups(self):
+        """Draw the power-ups lying on the map, from its sparse index"""
+        powerups = self.map_manager.powerups
+        if not powerups:
+            return
+        width = self.map_manager.width
+        camera_x, camera_y = self.camera
+        self.display_surface.blits([(self.powerup_icons[kind], (index % width * TILE_SIZE - camera_x,
+                                                                 index // width * TILE_SIZE - camera_y))
+                                    for index, kind in powerups.items()], doreturn=False)
+    
+    def camera_position(self, alpha):
+        """Pixel position of the screen's top-left corner in the arena: centred on the player, stopping at the
+        arena's edges, and fixed at the corner when the whole arena fits on screen"""
+        player_x, player_y = self.player.interpolated_position(alpha)
+        screen_width, screen_height = self.display_surface.get_size()
+        arena_width, arena_height = self.arena_size()
+        return (min(max(int(player_x) - screen_width // 2, 0), max(arena_width - screen_width, 0)),
+                min(max(int(player_y) - screen_height // 2, 0), max(arena_height - screen_height, 0)))
+    
+    def arena_size(self):
+        """Size of the whole arena in pixels"""
+        return self.map_manager.width * TILE_SIZE, self.map_manager.height * TILE_SIZE
+    
     def draw_ui(self):
         """Draw user interface elements"""
         # Draw controls info
-        controls = [
-            "WASD/Arrow Keys: Move",
-            "Space: Place Bomb",
-            "ESC: Pause"
-        ]
-        
-        for i, control in enumerate(controls):
-            text = self.font.render(control, True, WHITE)
+        for i, text in enumerate(self.control_texts):
             self.display_surface.blit(text, (10, 10 + i * 25))
 
-    def reset(self):
-        """Reset the level to initial state"""
-        # Recreate player at starting position
-        self.player = Player(1, 1, self.sprite_manager, self.map_manager)
+    def reset(self, spawn_index=0):
+        """Reset the level to initial state, with the player at one of the map's spawn points"""
+        # The match that just ended is a finished replay
+        if self.recorder:
+            self.recorder.save()
+        
+        # Fresh event bus and timers so the old player's handlers and bombs are dropped
+        self.events = EventBus()
+        self.subscribe_events()
+        self.scheduler = TimerWheel()
+        
+        # Recreate player at starting position, with the base stats
+        self.stats.reset()
+        self.player = Player(*self.map_manager.spawns[spawn_index], self.sprite_manager, self.map_manager,
+                             self.events, self.scheduler, self.stats)
         
         # Reset map to initial state
         self.map_manager.reset()
@@ -110,53 +352,35 @@ class Level:
         # Reset game state
         self.running = True
         self.player_dead = False
+        self.tick = 0
+        self.accumulator = 0
+        self.bomb_requested = False
+        self.particles.clear()
+        self.rehash()
+        if self.session:
+            self.session.reset()
     
     def check_player_death(self):
         """Check if player is hit by any explosion"""
-        if self.player_dead:
+        if self.player_dead or not self.player.is_in_blast():
             return
-            
-        # Check all bombs for explosion collision
+        
+        # The blast mask says the player is near an explosion; find the bomb that actually hit
         for bomb in self.player.bombs:
             if bomb.is_player_hit_by_explosion(self.player.x, self.player.y, self.player.size):
-                self.player_dead = True
-                self.death_screen.start_death_sequence()
+                self.events.publish(PlayerKilled(self.player, bomb))
                 return
-    
-    def check_chain_reactions(self):
-        """Check if any exploding bombs should trigger other bombs"""
-        # Check each bomb that is currently exploding
-        for bomb in self.player.bombs:
-            if bomb.exploded and not bomb.finished:
-                # Check if this explosion hits any other bombs
-                for other_bomb in self.player.bombs:
-                    if other_bomb != bomb and not other_bomb.exploded:
-                        # Check if other bomb is in this explosion's area
-                        if self.is_bomb_in_explosion_area(other_bomb, bomb):
-                            # Trigger the other bomb to explode immediately
-                            other_bomb.explode()
-    
-    def is_bomb_in_explosion_area(self, bomb, exploding_bomb):
-        """Check if a bomb is in the explosion area of another bomb"""
-        # Check if the bomb's tile position is in the explosion positions
-        for explosion_x, explosion_y in exploding_bomb.explosion_positions:
-            if bomb.tile_x == explosion_x and bomb.tile_y == explosion_y:
-                return True
-        return False
 
     def run(self, events):
         """Main level update and render"""
-        # Calculate delta time
-        dt = self.clock.tick(120)
+        # Delta time of the frame measured by the main loop
+        dt = self.clock.get_time()
         
         # Handle events
         self.handle_input(events)
         
-        # Handle movement
-        self.handle_movement()
-        
         # Update game state
         self.update(dt)
         
         # Render everything
-        self.draw() 
\ No newline at end of file
+        return self.draw() 
\ No newline at end of file
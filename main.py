@@ -4,58 +4,146 @@ Bomberman Game - Main Entry Point
 A classic multiplayer Bomberman game built with Python and Pygame
 """
 
-import pygame, sys
+import time
+launch_time = time.perf_counter()
+
+import pygame, sys, atexit
 from settings import *
 from game_state_manager import GameStateManager
 from main_menu import MainMenu
 from pause_menu import PauseMenu
-from level import Level
+from sprite_manager import SpriteManager
+from startup_report import StartupReport
+from alloc_tracker import AllocationTracker
 
 class Main:
-    def __init__(self):
+    def __init__(self, startup_report=None, telemetry_path=None, alloc_tracker=None, map_path=None, record_path=None):
+        self.startup_report = startup_report
+        self.telemetry_path = telemetry_path
+        self.map_path = map_path
+        self.record_path = record_path
+        self.alloc_tracker = alloc_tracker
+        if self.startup_report:
+            self.startup_report.mark('import')
+
         pygame.init()
         self.display_surface = pygame.display.set_mode((DISPLAY_WIDTH, DISPLAY_HEIGHT))
         pygame.display.set_caption("Bomberman")
         self.clock = pygame.time.Clock()
+        self.idle = False  # Last frame only redrew part of a frozen menu
+
+        # Decode sprites while the menu is up
+        self.sprite_manager = SpriteManager(background=True)
 
-        # Initialize scenes objects
+        # Scenes are built the first time the game switches to them
         self.game_state_manager = GameStateManager('main_menu')
-        self.main_menu = MainMenu(self.display_surface, self.game_state_manager)
-        self.pause_menu = PauseMenu(self.display_surface, self.game_state_manager)
-        self.level = Level(self.display_surface, self.game_state_manager, self.clock)
-        self.states = {
-            'main_menu': self.main_menu, 
-            'level': self.level,
-            'pause': self.pause_menu
-        }
+        self.game_state_manager.register_scene(
+            'main_menu', lambda: MainMenu(self.display_surface, self.game_state_manager))
+        self.game_state_manager.register_scene(
+            'pause', lambda: PauseMenu(self.display_surface, self.game_state_manager))
+        self.game_state_manager.register_scene('level', self.create_level)
+
+        if self.startup_report:
+            self.startup_report.mark('init')
+
+    def create_level(self):
+        """Build the level scene, streaming telemetry and recording replays if they were requested"""
+        # Imported here so the level stack loads when play starts, not before the first menu frame
+        from level import Level
+        from telemetry import Telemetry
+        from replay import ReplayRecorder
+        level = Level(self.display_surface, self.game_state_manager, self.clock, self.sprite_manager, self.map_path)
+        if self.telemetry_path:
+            level.telemetry = Telemetry(self.telemetry_path)
+        if self.record_path:
+            level.recorder = ReplayRecorder(self.record_path, self.map_path)
+        return level
 
     def handle_events(self, events):
         for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE and self.game_state_manager.get_state() == 'level':
                     self.game_state_manager.set_state('pause')
 
+    def quit(self):
+        """Close the game, failing the run if allocations went over budget"""
+        failed = False
+        if self.alloc_tracker:
+            self.alloc_tracker.finish()
+            failed = self.alloc_tracker.failed()
+        pygame.quit()
+        sys.exit(1 if failed else 0)
+
+    def tracked_state(self):
+        """Name of the state allocations are attributed to this frame"""
+        state = self.game_state_manager.get_state()
+        if state == 'level' and self.game_state_manager.get_scene('level').player_dead:
+            return 'death'
+        return state
+
+    def report_first_frame(self):
+        """Print the startup report once the first frame is on screen"""
+        self.startup_report.mark('first frame')
+        # The frame is already shown, so waiting here does not skew the numbers
+        self.sprite_manager.wait_until_loaded()
+        self.startup_report.add('assets', self.sprite_manager.load_time)
+        print(self.startup_report.format())
+        self.startup_report = None
+
     def run(self):
         while True:
-            # System
-            self.clock.tick(120)
+            self.run_frame()
+
+    def run_frame(self):
+        """Run one frame: events, the current scene and the display update"""
+        # System - a frozen menu only needs to keep up with input
+        self.clock.tick(IDLE_FPS if self.idle else FPS)
 
-            # Event handle
-            events = pygame.event.get()
-            self.handle_events(events)
+        # Event handle
+        events = pygame.event.get()
+        self.handle_events(events)
 
-            # Check for reset request before state handle
-            if self.game_state_manager.is_reset_requested():
-                self.level.reset()
-                self.game_state_manager.clear_reset_request()
+        # Check for reset request before state handle
+        if self.game_state_manager.is_reset_requested():
+            # A level that has not been built yet is already fresh
+            if self.game_state_manager.has_scene('level'):
+                self.game_state_manager.get_scene('level').reset()
+            self.game_state_manager.clear_reset_request()
 
-            # State handle
-            self.states[self.game_state_manager.get_state()].run(events)
+        # State handle
+        if self.alloc_tracker:
+            self.alloc_tracker.begin_frame(self.tracked_state())
+        # Scenes return the areas they changed, or None after drawing the whole screen
+        dirty = self.game_state_manager.get_scene().run(events)
+        self.idle = dirty is not None
 
+        if dirty is None:
             pygame.display.update()
+        elif dirty:
+            pygame.display.update(dirty)
+
+        if self.alloc_tracker:
+            self.alloc_tracker.end_frame()
+            if self.alloc_tracker.done():
+                self.quit()
+
+        if self.startup_report:
+            self.report_first_frame()
 
 if __name__ == '__main__':
-    Main().run() 
\ No newline at end of file
+    report = StartupReport(launch_time) if '--startup-report' in sys.argv else None
+    telemetry_path = sys.argv[sys.argv.index('--telemetry') + 1] if '--telemetry' in sys.argv else None
+    alloc_tracker = None
+    if '--track-allocs' in sys.argv:
+        # Installed before any scene is built so their fonts and surfaces are counted
+        budget = int(sys.argv[sys.argv.index('--alloc-budget') + 1]) if '--alloc-budget' in sys.argv else None
+        frames = int(sys.argv[sys.argv.index('--alloc-frames') + 1]) if '--alloc-frames' in sys.argv else None
+        alloc_tracker = AllocationTracker(surface_budget=budget, max_frames=frames)
+        alloc_tracker.install()
+        # Menus exit directly, so make sure the report still prints
+        atexit.register(alloc_tracker.finish)
+    map_path = sys.argv[sys.argv.index('--map') + 1] if '--map' in sys.argv else None
+    record_path = sys.argv[sys.argv.index('--record') + 1] if '--record' in sys.argv else None
+    Main(report, telemetry_path, alloc_tracker, map_path, record_path).run()
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Map Format - Handles reading and writing arena files
+
+Binary layout, little-endian:
+    header      magic, format version, width, height, spawn count, metadata length
+    spawns      spawn count pairs of (x, y) tile coordinates
+    metadata    UTF-8 JSON object (name, author, ...)
+    tiles       width * height bytes, row-major, 0 = grass, 1 = wall, 2 = brick
+
+The text format holds the same data in a form that is easy to edit by hand.
+"""
+
+import json
+import mmap
+import struct
+
+MAP_MAGIC = b'BMMAP\x00\x00\x00'
+MAP_VERSION = 1
+MAP_HEADER = struct.Struct('<8sHIIHI')
+SPAWN = struct.Struct('<II')
+
+# Tile type <-> character in the text format, as translate tables so whole rows convert at once
+TILE_CHARS = b'.#+'
+TILES_TO_TEXT = bytes.maketrans(bytes(range(len(TILE_CHARS))), TILE_CHARS)
+TEXT_TO_TILES = bytes.maketrans(TILE_CHARS, bytes(range(len(TILE_CHARS))))
+
+class MapFile:
+    """A binary map file, memory-mapped so regions are decoded only when asked for"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.mmap) < MAP_HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is too short to be a map file")
+        magic, version, self.width, self.height, spawn_count, metadata_length = MAP_HEADER.unpack_from(self.mmap)
+        if magic != MAP_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a map file")
+        if version != MAP_VERSION:
+            self.close()
+            raise ValueError(f"{path} is map format version {version}, expected {MAP_VERSION}")
+
+        offset = MAP_HEADER.size
+        self.spawns = [SPAWN.unpack_from(self.mmap, offset + i * SPAWN.size) for i in range(spawn_count)]
+        offset += spawn_count * SPAWN.size
+        self.metadata = json.loads(self.mmap[offset:offset + metadata_length] or b'{}')
+        self.tiles_offset = offset + metadata_length
+
+        if len(self.mmap) < self.tiles_offset + self.width * self.height:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+    def row(self, y, x=0, width=None):
+        """Decode part of one row as a mutable bytearray"""
+        width = self.width - x if width is None else width
+        start = self.tiles_offset + y * self.width + x
+        return bytearray(self.mmap[start:start + width])
+
+    def region(self, x, y, width, height):
+        """Decode a rectangle of tiles as a list of bytearray rows"""
+        return [self.row(row, x, width) for row in range(y, y + height)]
+
+    def tile(self, x, y):
+        """Read one tile without decoding its row"""
+        return self.mmap[self.tiles_offset + y * self.width + x]
+
+    def tiles(self):
+        """The whole tile grid as one flat bytes object"""
+        return self.mmap[self.tiles_offset:self.tiles_offset + self.width * self.height]
+
+    def close(self):
+        """Release the memory map"""
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_map(path, rows, spawns, metadata=None):
+    """Write tile rows, spawn points and metadata as a binary map file"""
+    height = len(rows)
+    width = len(rows[0]) if rows else 0
+    metadata_bytes = json.dumps(metadata or {}).encode()
+    with open(path, 'wb') as f:
+        f.write(MAP_HEADER.pack(MAP_MAGIC, MAP_VERSION, width, height, len(spawns), len(metadata_bytes)))
+        for x, y in spawns:
+            f.write(SPAWN.pack(x, y))
+        f.write(metadata_bytes)
+        for row in rows:
+            f.write(bytes(row))
+
+def write_text_map(path, rows, spawns, metadata=None):
+    """Write a map as editable text: key lines, then one character per tile"""
+    with open(path, 'w') as f:
+        f.write(f"# Bomberman map, format version {MAP_VERSION}\n")
+        f.write("# Tiles: . grass, # wall, + brick\n")
+        f.write(f"meta {json.dumps(metadata or {})}\n")
+        for x, y in spawns:
+            f.write(f"spawn {x} {y}\n")
+        f.write("tiles\n")
+        for row in rows:
+            f.write(bytes(row).translate(TILES_TO_TEXT).decode() + "\n")
+
+def read_text_map(path):
+    """Read a text map, returning (rows, spawns, metadata)"""
+    rows, spawns, metadata = [], [], {}
+    in_tiles = False
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if in_tiles:
+                if line:
+                    if line.strip(TILE_CHARS.decode()):
+                        raise ValueError(f"{path}:{number}: unknown tile in {line!r}")
+                    rows.append(bytearray(line.encode().translate(TEXT_TO_TILES)))
+            elif not line or line.startswith('#'):
+                continue
+            elif line == 'tiles':
+                in_tiles = True
+            elif line.startswith('spawn '):
+                x, y = line.split()[1:3]
+                spawns.append((int(x), int(y)))
+            elif line.startswith('meta '):
+                metadata = json.loads(line[5:])
+            else:
+                raise ValueError(f"{path}:{number}: unexpected line {line!r}")
+
+    if not rows or any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError(f"{path}: tile rows must all be the same length")
+    return rows, spawns, metadata
+
+def read_map(path):
+    """Read a binary or text map, returning (rows, spawns, metadata)"""
+    with open(path, 'rb') as f:
+        is_binary = f.read(len(MAP_MAGIC)) == MAP_MAGIC
+    if not is_binary:
+        return read_text_map(path)
+    with MapFile(path) as map_file:
+        return map_file.region(0, 0, map_file.width, map_file.height), map_file.spawns, map_file.metadata
@@ -2,19 +2,64 @@
 Map Manager - Handles the game map layout and collision detection
 """
 
+import random
 import pygame
+import numpy as np
 from settings import TILE_SIZE, GRID_WIDTH, GRID_HEIGHT
+from map_format import MapFile, read_map, write_map, write_text_map
+from powerups import place_powerups, MAX_BLAST_RANGE
+import zobrist
+
+# Blast directions in the order explosions spread: up, down, left, right
+BLAST_DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
 
 class MapManager:
-    def __init__(self, sprite_manager):
+    def __init__(self, sprite_manager, map_path=None, region=None):
         self.sprite_manager = sprite_manager
-        self.map_data = []
-        self.create_map()
+        self.map_data = []  # One bytearray per row
+        self.width = GRID_WIDTH
+        self.height = GRID_HEIGHT
+        self.spawns = []
+        self.metadata = {}
+        
+        # Arena file to load instead of the generated map, optionally just a fixed window of it for tools;
+        # the game itself always loads the whole arena
+        self.map_path = map_path
+        self.region = region
+        
+        # Collision bitmasks, bit (y * width + x) per tile
+        self.solid_mask = 0  # Walls and bricks
+        self.bomb_mask = 0  # Active (unexploded) bombs
+        self.blast_mask = 0  # Tiles covered by active explosions
+        
+        # Memoized blast reach, tile index -> (open tiles, stopped by a brick) per direction
+        self.reach_cache = {}
+        
+        # Power-ups still under their bricks, one byte per tile (y * width + x): 0 for none, else kind + 1
+        self.hidden_powerups = bytearray()
+        # Dropped power-ups waiting to be picked up, few enough to index sparsely: tile index -> kind
+        self.powerups = {}
+        self.rng = random.Random()  # Seed it for the same power-up placement every reset
+        
+        # Zobrist hash of the whole simulation state, kept up to date by every change to it;
+        # bombs and players XOR their own keys in, as they do their bits into the masks
+        self.state_hash = 0
+        
+        # Bumped on every tile change so unchanged maps can share one snapshot
+        self.version = 0
+        self._state_version = None
+        self._state = None
+        self.reset()
     
     def create_map(self):
         """Create a classic Bomberman map: border of unbreakable walls, fewer unbreakables inside, rest breakable bricks."""
         # 0 = grass, 1 = unbreakable wall, 2 = breakable brick
-        self.map_data = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        self.version += 1
+        self.width = GRID_WIDTH
+        self.height = GRID_HEIGHT
+        self.map_data = [bytearray(GRID_WIDTH) for _ in range(GRID_HEIGHT)]
+        self.spawns = [(1, 1), (GRID_WIDTH-2, 1), (1, GRID_HEIGHT-2), (GRID_WIDTH-2, GRID_HEIGHT-2)]
+        self.metadata = {'name': "Classic"}
 
         # Border walls
         for x in range(GRID_WIDTH):
@@ -42,11 +87,50 @@ class MapManager:
                     # Make about 70% of grass tiles breakable bricks
                     if (x + y) % 3 != 0:
                         self.map_data[y][x] = 2
+        
+        self.bomb_mask = 0
+        self.blast_mask = 0
+        self.build_collision()
+    
+    def load_map(self, path, region=None):
+        """Load an arena from a binary or text map file, or an (x, y, width, height) window of it"""
+        self.version += 1
+        if region is not None:
+            # Only the requested rows are paged in from the memory-mapped file
+            with MapFile(path) as map_file:
+                x, y, width, height = region
+                self.map_data = map_file.region(x, y, width, height)
+                self.spawns = [(sx - x, sy - y) for sx, sy in map_file.spawns
+                               if x <= sx < x + width and y <= sy < y + height]
+                self.metadata = map_file.metadata
+        else:
+            self.map_data, self.spawns, self.metadata = read_map(path)
+        self.height = len(self.map_data)
+        self.width = len(self.map_data[0])
+        if not self.spawns:
+            raise ValueError(f"{path} has no spawn points")
+        for x, y in self.spawns:
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise ValueError(f"{path}: spawn point ({x}, {y}) is outside the {self.width}x{self.height} arena")
+            if not self.is_walkable(x, y):
+                raise ValueError(f"{path}: spawn point ({x}, {y}) is not on a grass tile")
+        
+        self.bomb_mask = 0
+        self.blast_mask = 0
+        self.build_collision()
+    
+    def save_map(self, path):
+        """Save the current arena, as text if the path ends in .txt and binary otherwise"""
+        if path.endswith('.txt'):
+            write_text_map(path, self.map_data, self.spawns, self.metadata)
+        else:
+            write_map(path, self.map_data, self.spawns, self.metadata)
     
     def add_breakable_bricks(self):
         """Add breakable bricks to open areas"""
         import random
         
+        self.version += 1
         for y in range(1, GRID_HEIGHT - 1):
             for x in range(1, GRID_WIDTH - 1):
                 # Only place bricks in grass areas (0)
@@ -56,6 +140,24 @@ class MapManager:
                         # Don't place bricks in player starting areas
                         if not self.is_player_start_area(x, y):
                             self.map_data[y][x] = 2  # 2 = breakable brick
+        
+        self.build_collision()
+    
+    def build_collision(self):
+        """Rebuild the solid tile bitmask from the map, dropping the blast reach it replaces"""
+        self.reach_cache = {}
+        # Pack one bit per tile in bulk so large arenas build in milliseconds
+        tiles = np.frombuffer(b''.join(self.map_data), dtype=np.uint8)
+        bits = np.packbits(tiles != 0, bitorder='little')
+        self.solid_mask = int.from_bytes(bits.tobytes(), 'little')
+    
+    def set_bomb(self, x, y, active):
+        """Mark a tile as blocked (or no longer blocked) by an unexploded bomb"""
+        bit = 1 << (y * self.width + x)
+        if active:
+            self.bomb_mask |= bit
+        else:
+            self.bomb_mask &= ~bit
     
     def is_player_start_area(self, x, y):
         """Check if position is in a player starting area"""
@@ -70,17 +172,17 @@ class MapManager:
     
     def get_tile_type(self, x, y):
         """Get tile type at position"""
-        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+        if 0 <= x < self.width and 0 <= y < self.height:
             return self.map_data[y][x]
         return 1  # Wall if out of bounds
     
     def get_width(self):
         """Get map width in tiles"""
-        return GRID_WIDTH
+        return self.width
     
     def get_height(self):
         """Get map height in tiles"""
-        return GRID_HEIGHT
+        return self.height
     
     def is_walkable(self, x, y):
         """Check if position is walkable"""
@@ -89,18 +191,129 @@ class MapManager:
     
     def destroy_brick(self, x, y):
         """Destroy a breakable brick"""
-        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+        if 0 <= x < self.width and 0 <= y < self.height:
             if self.map_data[y][x] == 2:  # Breakable brick
                 self.map_data[y][x] = 0  # Convert to grass
+                self.version += 1
+                
+                # Keep collision data and the state hash in step without a rebuild
+                index = y * self.width + x
+                self.solid_mask &= ~(1 << index)
+                self.invalidate_reach(x, y)
+                self.state_hash ^= zobrist.key(zobrist.TILE, index, 2) ^ zobrist.key(zobrist.TILE, index, 0)
+                
+                # Drop whatever the brick was hiding
+                hidden = self.hidden_powerups[index]
+                if hidden:
+                    self.hidden_powerups[index] = 0
+                    kind = self.powerups[index] = hidden - 1
+                    self.state_hash ^= (zobrist.key(zobrist.HIDDEN_POWERUP, index, kind) ^
+                                        zobrist.key(zobrist.POWERUP, index, kind))
                 return True
         return False
     
-    def render(self, screen):
-        """Render the map"""
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
+    def blast_reach(self, x, y):
+        """Open tiles a blast from (x, y) crosses in each direction before it stops, and whether a brick
+        stopped it, as ((tiles, brick) up, down, left, right); walked once and then cached"""
+        index = y * self.width + x
+        reach = self.reach_cache.get(index)
+        if reach is None:
+            reach = tuple(self.walk_reach(x, y, dx, dy) for dx, dy in BLAST_DIRECTIONS)
+            self.reach_cache[index] = reach
+        return reach
+    
+    def walk_reach(self, x, y, dx, dy):
+        """Walk one direction from a tile to the first wall, brick or map edge, up to the longest blast"""
+        for distance in range(MAX_BLAST_RANGE):
+            x += dx
+            y += dy
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                return distance, False
+            tile = self.map_data[y][x]
+            if tile:
+                return distance, tile == 2
+        return MAX_BLAST_RANGE, False
+    
+    def invalidate_reach(self, x, y):
+        """Forget the reach of every tile whose blast could have been stopped at a changed tile"""
+        cache = self.reach_cache
+        cache.pop(y * self.width + x, None)
+        for dx, dy in BLAST_DIRECTIONS:
+            # Only tiles up to and including the next obstacle along the row or column can see this one
+            tx, ty = x, y
+            for _ in range(MAX_BLAST_RANGE + 1):
+                tx += dx
+                ty += dy
+                if not (0 <= tx < self.width and 0 <= ty < self.height):
+                    break
+                cache.pop(ty * self.width + tx, None)
+                if self.map_data[ty][tx]:
+                    break
+    
+    def blast_tiles(self, x, y, blast_range):
+        """Tiles a bomb at (x, y) would cover, bricks it would break included, without changing the map"""
+        tiles = [(x, y)]
+        for (dx, dy), (reach, brick) in zip(BLAST_DIRECTIONS, self.blast_reach(x, y)):
+            length = min(reach, blast_range)
+            if brick and reach < blast_range:
+                length += 1
+            tiles.extend((x + dx * distance, y + dy * distance) for distance in range(1, length + 1))
+        return tiles
+    
+    def collect_powerup(self, x, y):
+        """Pick up the power-up lying on a tile, returning its kind or None"""
+        index = y * self.width + x
+        kind = self.powerups.pop(index, None)
+        if kind is not None:
+            self.version += 1
+            self.state_hash ^= zobrist.key(zobrist.POWERUP, index, kind)
+        return kind
+    
+    def hash_map(self):
+        """Zobrist hash of the tiles and power-ups alone, computed from scratch"""
+        tiles = np.frombuffer(b''.join(self.map_data), dtype=np.uint8)
+        hidden = np.frombuffer(self.hidden_powerups, dtype=np.uint8)
+        hidden_indices = np.flatnonzero(hidden)
+        dropped = self.powerups
+        return (zobrist.combined_keys(zobrist.TILE, np.arange(len(tiles)), tiles) ^
+                zobrist.combined_keys(zobrist.HIDDEN_POWERUP, hidden_indices, hidden[hidden_indices] - 1) ^
+                zobrist.combined_keys(zobrist.POWERUP, list(dropped), list(dropped.values())))
+    
+    def save_state(self):
+        """Capture the tile grid, collision data, power-ups and state hash, reusing the last map snapshot if
+        nothing on the map changed"""
+        if self._state_version != self.version:
+            tiles = tuple(bytes(row) for row in self.map_data)
+            self._state = (tiles, self.solid_mask, bytes(self.hidden_powerups), tuple(self.powerups.items()))
+            self._state_version = self.version
+        # Bombs and players move the hash without touching the map, so it goes alongside the shared snapshot
+        return self._state + (self.state_hash,)
+    
+    def load_state(self, state):
+        """Restore the tile grid, power-ups and state hash from a snapshot made by save_state"""
+        tiles, self.solid_mask, hidden_powerups, powerups, self.state_hash = state
+        # Blast reach only holds if the tiles are the very ones already in place
+        unchanged = self._state_version == self.version and self._state is not None and self._state[0] is tiles
+        if not unchanged:
+            self.reach_cache = {}
+        self.map_data = [bytearray(row) for row in tiles]
+        self.hidden_powerups = bytearray(hidden_powerups)
+        self.powerups = dict(powerups)
+        self.version += 1
+        self._state = state[:4]
+        self._state_version = self.version
+    
+    def render(self, screen, camera=(0, 0)):
+        """Render the part of the map on screen, with camera the pixel position of the screen's top-left corner"""
+        camera_x, camera_y = camera
+        screen_width, screen_height = screen.get_size()
+        first_x, first_y = camera_x // TILE_SIZE, camera_y // TILE_SIZE
+        last_x = min((camera_x + screen_width - 1) // TILE_SIZE, self.width - 1)
+        last_y = min((camera_y + screen_height - 1) // TILE_SIZE, self.height - 1)
+        for y in range(first_y, last_y + 1):
+            for x in range(first_x, last_x + 1):
                 tile_type = self.map_data[y][x]
-                pos = (x * TILE_SIZE, y * TILE_SIZE)
+                pos = (x * TILE_SIZE - camera_x, y * TILE_SIZE - camera_y)
                 
                 if tile_type == 0:  # Grass
                     screen.blit(self.sprite_manager.get_sprite('grass'), pos)
@@ -111,4 +324,10 @@ class MapManager:
     
     def reset(self):
         """Reset the map to initial state"""
-        self.create_map() 
\ No newline at end of file
+        if self.map_path:
+            self.load_map(self.map_path, self.region)
+        else:
+            self.create_map()
+        self.hidden_powerups = place_powerups(self.map_data, self.rng)
+        self.powerups = {}
+        self.state_hash = self.hash_map()
@@ -0,0 +1,108 @@
+"""
+Netcode - Handles client-side prediction and rollback re-simulation
+"""
+
+from settings import ROLLBACK_WINDOW
+
+class TickRing:
+    """Fixed-size ring buffer holding one value per simulation tick"""
+    def __init__(self, size):
+        self.size = size
+        self.ticks = [None] * size
+        self.values = [None] * size
+
+    def store(self, tick, value):
+        """Store a value for a tick, overwriting the oldest entry"""
+        index = tick % self.size
+        self.ticks[index] = tick
+        self.values[index] = value
+
+    def get(self, tick):
+        """Get the value stored for a tick, or None if it has been overwritten"""
+        index = tick % self.size
+        if self.ticks[index] != tick:
+            return None
+        return self.values[index]
+
+    def clear(self):
+        """Forget all stored ticks"""
+        self.ticks = [None] * self.size
+        self.values = [None] * self.size
+
+class RollbackSession:
+    """Predicts local input immediately and re-simulates when authoritative input disagrees"""
+    def __init__(self, level, window=ROLLBACK_WINDOW):
+        self.level = level
+        self.window = window
+        self.snapshots = TickRing(window + 1)
+        self.inputs = TickRing(window + 1)
+        self.hashes = TickRing(window + 1)  # State hash after each tick, to compare with peers
+
+        # Authoritative inputs that arrived before we simulated their tick
+        self.pending_inputs = {}
+
+        # Stats
+        self.rollbacks = 0
+        self.resimulated_ticks = 0
+        self.desyncs = 0
+
+        level.session = self
+
+    def advance(self, input_bits):
+        """Simulate the next tick with a predicted (or already confirmed) input"""
+        tick = self.level.tick
+        input_bits = self.pending_inputs.pop(tick, input_bits)
+        self.snapshots.store(tick, self.level.save_state())
+        self.inputs.store(tick, input_bits)
+        self.level.simulate_tick(input_bits)
+        self.hashes.store(tick, self.level.state_hash)
+
+    def confirm_input(self, tick, input_bits):
+        """Apply an authoritative input, rolling back if the prediction for that tick was wrong"""
+        if tick >= self.level.tick:
+            # Not simulated yet - use it when we get there
+            self.pending_inputs[tick] = input_bits
+            return False
+
+        predicted = self.inputs.get(tick)
+        if predicted is None:
+            # Older than the rollback window - too late to correct
+            return False
+        if predicted == input_bits:
+            return False
+
+        self.inputs.store(tick, input_bits)
+        return self.rollback(tick)
+
+    def check_hash(self, tick, state_hash):
+        """Compare a peer's state hash after a confirmed tick with ours, returning False on a desync"""
+        local_hash = self.hashes.get(tick)
+        if local_hash is None or local_hash == state_hash:
+            # Matching, or too old to tell
+            return True
+        self.desyncs += 1
+        return False
+
+    def rollback(self, tick):
+        """Restore the snapshot taken before a tick and re-simulate up to the present"""
+        state = self.snapshots.get(tick)
+        if state is None:
+            return False
+
+        current_tick = self.level.tick
+        self.level.load_state(state)
+        self.level.resimulating = True
+        for resim_tick in range(tick, current_tick):
+            self.advance(self.inputs.get(resim_tick))
+        self.level.resimulating = False
+
+        self.rollbacks += 1
+        self.resimulated_ticks += current_tick - tick
+        return True
+
+    def reset(self):
+        """Drop all history, e.g. when the level restarts"""
+        self.snapshots.clear()
+        self.inputs.clear()
+        self.hashes.clear()
+        self.pending_inputs = {}
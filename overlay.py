@@ -0,0 +1,39 @@
+"""
+Overlay - Handles the frozen, darkened game frame that pause and death menus draw over
+"""
+
+import pygame
+from settings import BLACK
+
+class FrozenBackground:
+    """Snapshot of the last game frame, darkened once, that menus restore instead of redrawing the game"""
+    def __init__(self, display_surface, darkness):
+        self.display_surface = display_surface
+        self.darkness = darkness
+        self.surface = None
+
+    def capture(self):
+        """Copy the current display and darken it"""
+        self.surface = self.display_surface.copy()
+        shade = pygame.Surface(self.surface.get_size())
+        shade.fill(BLACK)
+        shade.set_alpha(self.darkness)
+        self.surface.blit(shade, (0, 0))
+
+    def is_captured(self):
+        """Check if a snapshot is being shown"""
+        return self.surface is not None
+
+    def release(self):
+        """Drop the snapshot so the next capture takes a fresh one"""
+        self.surface = None
+
+    def draw(self):
+        """Cover the whole display with the snapshot"""
+        self.display_surface.blit(self.surface, (0, 0))
+        return self.display_surface.get_rect()
+
+    def restore(self, rect):
+        """Cover one area of the display with the snapshot, returning the area"""
+        self.display_surface.blit(self.surface, rect, rect)
+        return rect
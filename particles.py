@@ -0,0 +1,205 @@
+"""
+Particles - Handles explosion sparks, smoke and brick debris
+"""
+
+import math
+import numpy as np
+import pygame
+from settings import TILE_SIZE, PARTICLE_CAPACITY, PARTICLE_SIZE
+
+# Emitter presets: count, speed range (px/s), lifetime range (s), gravity (px/s^2), drag (1/s), colors
+SPARKS = (12, (120, 420), (0.2, 0.5), 300, 2.0, [(255, 240, 120), (255, 190, 60), (255, 120, 20)])
+SMOKE = (6, (10, 60), (0.6, 1.2), -40, 1.0, [(70, 70, 70), (100, 100, 100), (130, 130, 130)])
+DEBRIS = (16, (80, 260), (0.4, 0.8), 900, 0.5, [(150, 60, 40), (190, 100, 60), (110, 45, 30)])
+
+class ParticleSystem:
+    """Structure-of-arrays particle pool; a slot is free while its lifetime is <= 0"""
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+
+        # Particle state
+        self.position = np.zeros((capacity, 2), np.float32)
+        self.velocity = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.max_life = np.ones(capacity, np.float32)
+        self.color = np.zeros((capacity, 3), np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.drag = np.zeros(capacity, np.float32)
+
+        # Scratch buffers so update and draw allocate nothing per frame
+        self._factor = np.zeros(capacity, np.float32)
+        self._step = np.zeros((capacity, 2), np.float32)
+        self._alive = np.zeros(capacity, bool)
+        self._outside = np.zeros(capacity, bool)
+        self._edge = np.zeros(capacity, bool)
+        self._visible = np.zeros(capacity, bool)
+        self._draw_edge = np.zeros(capacity, bool)
+        self._draw_position = np.zeros((capacity, 2), np.float32)
+        self._draw_fade = np.zeros(capacity, np.float32)
+        self._draw_max_life = np.zeros(capacity, np.float32)
+        self._draw_color = np.zeros((capacity, 3), np.float32)
+        self._draw_x = np.zeros(capacity, np.intp)
+        self._draw_y = np.zeros(capacity, np.intp)
+        self._draw_channel = np.zeros(capacity, np.uint32)
+        self._draw_mapped = np.zeros(capacity, np.uint32)
+
+        # Slots past this index have never been used since the pool was last empty
+        self.high_water = 0
+
+        # Live slots as of the last update, which draw renders
+        self.live_count = 0
+        self.updated_count = 0
+
+    def emit(self, x, y, preset, spread=TILE_SIZE / 4):
+        """Spawn a burst of particles around a pixel position, recycling dead slots"""
+        count, speed, life, gravity, drag, colors = preset
+        free = np.flatnonzero(self.life <= 0)[:count]
+        n = len(free)
+        if n == 0:
+            return 0
+
+        rng = self.rng
+        angle = rng.uniform(0, 2 * math.pi, n)
+        magnitude = rng.uniform(speed[0], speed[1], n)
+        lifetime = rng.uniform(life[0], life[1], n)
+
+        self.position[free, 0] = x + rng.uniform(-spread, spread, n)
+        self.position[free, 1] = y + rng.uniform(-spread, spread, n)
+        self.velocity[free, 0] = np.cos(angle) * magnitude
+        self.velocity[free, 1] = np.sin(angle) * magnitude
+        self.life[free] = lifetime
+        self.max_life[free] = lifetime
+        self.color[free] = np.asarray(colors, np.float32)[rng.integers(0, len(colors), n)]
+        self.gravity[free] = gravity
+        self.drag[free] = drag
+
+        self.high_water = max(self.high_water, int(free[-1]) + 1)
+        return n
+
+    def emit_explosion(self, tile_x, tile_y):
+        """Sparks and smoke for one explosion tile"""
+        x = tile_x * TILE_SIZE + TILE_SIZE / 2
+        y = tile_y * TILE_SIZE + TILE_SIZE / 2
+        self.emit(x, y, SPARKS)
+        self.emit(x, y, SMOKE)
+
+    def emit_debris(self, tile_x, tile_y):
+        """Brick fragments for a destroyed brick"""
+        self.emit(tile_x * TILE_SIZE + TILE_SIZE / 2, tile_y * TILE_SIZE + TILE_SIZE / 2, DEBRIS)
+
+    def update(self, dt, width, height):
+        """Advance every particle by dt seconds in a few vectorized passes, killing any that leave the
+        width x height pixel area"""
+        count = self.high_water
+        self.updated_count = count
+        if count == 0:
+            self.live_count = 0
+            return
+
+        life = self.life[:count]
+        velocity = self.velocity[:count]
+        position = self.position[:count]
+        factor = self._factor[:count]
+        step = self._step[:count]
+        outside = self._outside[:count]
+        edge = self._edge[:count]
+        alive = self._alive[:count]
+
+        np.subtract(life, dt, out=life)
+
+        # Drag, then gravity
+        np.multiply(self.drag[:count], -dt, out=factor)
+        np.add(factor, 1, out=factor)
+        np.maximum(factor, 0, out=factor)
+        np.multiply(velocity, factor[:, None], out=velocity)
+        np.multiply(self.gravity[:count], dt, out=factor)
+        np.add(velocity[:, 1], factor, out=velocity[:, 1])
+
+        np.multiply(velocity, dt, out=step)
+        np.add(position, step, out=position)
+
+        # Kill particles that left the area
+        np.less(position[:, 0], 0, out=outside)
+        np.greater_equal(position[:, 0], width - PARTICLE_SIZE, out=edge)
+        np.logical_or(outside, edge, out=outside)
+        np.less(position[:, 1], 0, out=edge)
+        np.logical_or(outside, edge, out=outside)
+        np.greater_equal(position[:, 1], height - PARTICLE_SIZE, out=edge)
+        np.logical_or(outside, edge, out=outside)
+        np.copyto(life, 0, where=outside)
+
+        np.greater(life, 0, out=alive)
+        self.live_count = int(np.count_nonzero(alive))
+        if self.live_count == 0:
+            self.high_water = 0
+
+    def draw(self, surface, camera=(0, 0)):
+        """Write live particles on screen straight into the surface pixels, fading with age, with camera the
+        pixel position of the surface's top-left corner"""
+        count = self.updated_count
+        if self.live_count == 0:
+            return
+
+        # Only the particles inside the surface, shifted to its coordinates
+        camera_x, camera_y = camera
+        width, height = surface.get_size()
+        visible = self._visible[:count]
+        edge = self._draw_edge[:count]
+        x, y = self.position[:count, 0], self.position[:count, 1]
+        np.greater_equal(x, camera_x, out=visible)
+        np.less(x, camera_x + width - PARTICLE_SIZE, out=edge)
+        np.logical_and(visible, edge, out=visible)
+        np.greater_equal(y, camera_y, out=edge)
+        np.logical_and(visible, edge, out=visible)
+        np.less(y, camera_y + height - PARTICLE_SIZE, out=edge)
+        np.logical_and(visible, edge, out=visible)
+        np.logical_and(visible, self._alive[:count], out=visible)
+        n = int(np.count_nonzero(visible))
+        if n == 0:
+            return
+
+        position = self._draw_position[:n]
+        fade = self._draw_fade[:n]
+        max_life = self._draw_max_life[:n]
+        color = self._draw_color[:n]
+        xs = self._draw_x[:n]
+        ys = self._draw_y[:n]
+
+        # Gather the visible slots into the front of the scratch buffers
+        np.compress(visible, self.position[:count], axis=0, out=position)
+        np.compress(visible, self.life[:count], out=fade)
+        np.compress(visible, self.max_life[:count], out=max_life)
+        np.compress(visible, self.color[:count], axis=0, out=color)
+        np.divide(fade, max_life, out=fade)
+        np.multiply(color, fade[:, None], out=color)
+        np.subtract(position, (camera_x, camera_y), out=position)
+        np.copyto(xs, position[:, 0], casting='unsafe')
+        np.copyto(ys, position[:, 1], casting='unsafe')
+
+        # Map colors to the surface's pixel format so each pixel is a single write
+        channel = self._draw_channel[:n]
+        mapped = self._draw_mapped[:n]
+        mapped.fill(0)
+        for index, shift in enumerate(surface.get_shifts()[:3]):
+            np.copyto(channel, color[:, index], casting='unsafe')
+            np.left_shift(channel, shift, out=channel)
+            np.bitwise_or(mapped, channel, out=mapped)
+        if surface.get_masks()[3]:
+            np.bitwise_or(mapped, surface.get_masks()[3], out=mapped)
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        for offset_y in range(PARTICLE_SIZE):
+            for offset_x in range(PARTICLE_SIZE):
+                pixels[xs, ys] = mapped
+                xs += 1
+            xs -= PARTICLE_SIZE
+            ys += 1
+        del pixels  # Unlock the surface
+
+    def clear(self):
+        """Kill every particle"""
+        self.life[:] = 0
+        self.high_water = 0
+        self.live_count = 0
+        self.updated_count = 0
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pygame
 from settings import *
+from overlay import FrozenBackground
 
 class PauseMenu:
     def __init__(self, display_surface, game_state_manager):
@@ -25,6 +26,34 @@ class PauseMenu:
         
         # Flag to prevent ESC from being processed immediately when entering pause
         self.just_entered_pause = False
+        
+        # Everything on the menu is static, so render it once
+        self.title_text = self.font.render('PAUSED', True, self.title_color)
+        self.title_rect = self.title_text.get_rect(center=(DISPLAY_CENTER[0], DISPLAY_CENTER[1] - 100))
+        
+        # (normal, selected) text per option
+        self.option_texts = [
+            (self.small_font.render(option, True, self.option_color), self.small_font.render(option, True, self.selected_color))
+            for option in self.options
+        ]
+        self.option_rects = [
+            texts[0].get_rect(center=(DISPLAY_CENTER[0], DISPLAY_CENTER[1] + i * 50))
+            for i, texts in enumerate(self.option_texts)
+        ]
+        
+        instructions = [
+            'Use UP/DOWN arrows to navigate',
+            'Press ENTER to select',
+            'Press ESC to resume'
+        ]
+        self.instruction_texts = []
+        for i, instruction in enumerate(instructions):
+            text = self.small_font.render(instruction, True, WHITE)
+            self.instruction_texts.append((text, text.get_rect(center=(DISPLAY_CENTER[0], DISPLAY_CENTER[1] + 200 + i * 30))))
+        
+        # The game frame under the menu, frozen and darkened when pausing
+        self.background = FrozenBackground(display_surface, 128)
+        self.drawn_option = None  # Selection currently on screen, None until the menu is drawn
 
     def handle_input(self, events):
         current_time = pygame.time.get_ticks()
@@ -70,37 +99,30 @@ class PauseMenu:
         if not self._was_in_pause:
             self.just_entered_pause = True
             self._was_in_pause = True
+            self.background.capture()
+            self.drawn_option = None
         
         self.handle_input(events)
-        self.draw()
+        return self.draw()
 
     def draw(self):
-        # Create semi-transparent overlay
-        overlay = pygame.Surface((DISPLAY_WIDTH, DISPLAY_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.display_surface.blit(overlay, (0, 0))
-        
-        # Draw title
-        title_text = self.font.render('PAUSED', True, self.title_color)
-        title_rect = title_text.get_rect(center=(DISPLAY_CENTER[0], DISPLAY_CENTER[1] - 100))
-        self.display_surface.blit(title_text, title_rect)
-        
-        # Draw options
-        for i, option in enumerate(self.options):
-            color = self.selected_color if i == self.selected_option else self.option_color
-            text = self.small_font.render(option, True, color)
-            rect = text.get_rect(center=(DISPLAY_CENTER[0], DISPLAY_CENTER[1] + i * 50))
-            self.display_surface.blit(text, rect)
+        """Draw the menu over the frozen game frame, returning the areas of the display that changed"""
+        if self.drawn_option is None:
+            # First frame: the whole screen
+            dirty = [self.background.draw()]
+            self.display_surface.blit(self.title_text, self.title_rect)
+            for text, rect in self.instruction_texts:
+                self.display_surface.blit(text, rect)
+            changed = range(len(self.options))
+        elif self.drawn_option != self.selected_option:
+            # Selection moved: only the two options involved
+            changed = (self.drawn_option, self.selected_option)
+            dirty = [self.background.restore(self.option_rects[i]) for i in changed]
+        else:
+            return []
         
-        # Draw instructions
-        instructions = [
-            'Use UP/DOWN arrows to navigate',
-            'Press ENTER to select',
-            'Press ESC to resume'
-        ]
-        
-        for i, instruction in enumerate(instructions):
-            text = self.small_font.render(instruction, True, WHITE)
-            rect = text.get_rect(center=(DISPLAY_CENTER[0], DISPLAY_CENTER[1] + 200 + i * 30))
-            self.display_surface.blit(text, rect) 
\ No newline at end of file
+        for i in changed:
+            text = self.option_texts[i][i == self.selected_option]
+            self.display_surface.blit(text, self.option_rects[i])
+        self.drawn_option = self.selected_option
+        return dirty
@@ -3,268 +3,305 @@ Player - Handles player movement, bomb placement, and collision detection
 """
 
 import pygame
-from settings import TILE_SIZE, PLAYER_SIZE, PLAYER_SPEED
+from settings import TILE_SIZE, PLAYER_SIZE, SUBPIXELS, CORNER_ASSIST, TICK_RATE, BASE_TICK_RATE, BLAST_MARGIN
+from events import EventBus, BombPlaced, BombExploded, ExplosionEnded
+from scheduler import TimerWheel
+from powerups import PlayerStats, STAT_COLUMNS
+import zobrist
+
+# Input bitmask used for prediction, rollback and replays
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+INPUT_BOMB = 16
+
+def read_input(keys):
+    """Encode the pressed movement keys as an input bitmask"""
+    input_bits = 0
+    if keys[pygame.K_UP] or keys[pygame.K_w]: input_bits |= INPUT_UP
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]: input_bits |= INPUT_DOWN
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]: input_bits |= INPUT_LEFT
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]: input_bits |= INPUT_RIGHT
+    return input_bits
 
 class Player:
-    def __init__(self, x, y, sprite_manager, map_manager):
-        self.x = x * TILE_SIZE + TILE_SIZE // 2  # Center in tile
-        self.y = y * TILE_SIZE + TILE_SIZE // 2
+    def __init__(self, x, y, sprite_manager, map_manager, events=None, scheduler=None, stats=None, index=0):
+        # Fixed-point position of the player's center, SUBPIXELS units per pixel
+        self.fx = (x * TILE_SIZE + TILE_SIZE // 2) * SUBPIXELS  # Center in tile
+        self.fy = (y * TILE_SIZE + TILE_SIZE // 2) * SUBPIXELS
+        
+        # Position at the start of the current tick, for render interpolation
+        self.prev_fx = self.fx
+        self.prev_fy = self.fy
         self.sprite_manager = sprite_manager
         self.map_manager = map_manager
-        self.speed = PLAYER_SPEED
         self.size = PLAYER_SIZE
         
+        # Bombs, range, speed and kick live in the shared stat columns, at this player's row
+        self.stats = stats if stats is not None else PlayerStats()
+        self.index = index
+        
         # Movement
-        self.dx = 0
+        self.dx = 0  # Primary direction, pixels per tick
         self.dy = 0
+        self.input_bits = 0
         
         # Bomb placement
         self.bombs = []
-        self.max_bombs = 2
-        
-    def handle_input(self, keys):
-        """Handle keyboard input for movement"""
-        # Check if any movement keys are pressed
-        pressed_keys = []
-        if keys[pygame.K_UP] or keys[pygame.K_w]: pressed_keys.append("UP")
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]: pressed_keys.append("DOWN")
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]: pressed_keys.append("LEFT")
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]: pressed_keys.append("RIGHT")
-        
-        # If no keys are pressed, stop movement
-        if not pressed_keys:
-            self.dx = 0
-            self.dy = 0
-            return
-        
-        # Get primary movement direction
-        primary_dx = 0
-        primary_dy = 0
-        
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            primary_dy = -self.speed
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            primary_dy = self.speed
-        elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            primary_dx = -self.speed
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            primary_dx = self.speed
         
-        # Set primary direction
-        self.dx = primary_dx
-        self.dy = primary_dy
+        # Bombs report their explosions here instead of being polled
+        self.events = events if events is not None else EventBus()
+        self.events.subscribe(BombExploded, self.on_bomb_exploded)
+        self.events.subscribe(ExplosionEnded, self.on_explosion_ended)
         
-        # Check if we can move in primary direction
-        target_x = self.x + self.dx
-        target_y = self.y + self.dy
-        can_move_primary = self.can_move_to(target_x, target_y)
+        # Fuses and explosions are timed by the level's scheduler
+        self.scheduler = scheduler if scheduler is not None else TimerWheel()
         
-        # If only one key pressed, use primary movement
-        if len(pressed_keys) == 1:
-            if not can_move_primary:
-                self.dx = 0
-                self.dy = 0
-            return
+        # This player's share of the map's state hash, swapped out when the tile or stats change
+        self.hash_key = 0
+        self.hash_tile = None
+        self.rehash()
         
-        # Multiple keys pressed - try diagonal movement for smooth cornering
-        if primary_dx != 0:  # Moving horizontally
-            # Try diagonal movement by adding vertical component
-            if keys[pygame.K_UP] or keys[pygame.K_w]:
-                diagonal_x = self.x + self.dx
-                diagonal_y = self.y - self.speed
-                can_diagonal = self.can_move_diagonally(diagonal_x, diagonal_y)
-                if can_diagonal:
-                    self.dy = -self.speed
-            elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-                diagonal_x = self.x + self.dx
-                diagonal_y = self.y + self.speed
-                can_diagonal = self.can_move_diagonally(diagonal_x, diagonal_y)
-                if can_diagonal:
-                    self.dy = self.speed
-        elif primary_dy != 0:  # Moving vertically
-            # Try diagonal movement by adding horizontal component
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                diagonal_x = self.x - self.speed
-                diagonal_y = self.y + self.dy
-                can_diagonal = self.can_move_diagonally(diagonal_x, diagonal_y)
-                if can_diagonal:
-                    self.dx = -self.speed
-            elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                diagonal_x = self.x + self.speed
-                diagonal_y = self.y + self.dy
-                can_diagonal = self.can_move_diagonally(diagonal_x, diagonal_y)
-                if can_diagonal:
-                    self.dx = self.speed
+    @property
+    def speed(self):
+        """Pixels moved per 1/60 s"""
+        return self.stats.speed[self.index]
+    
+    @property
+    def max_bombs(self):
+        """Bombs that can be out at once"""
+        return self.stats.bombs[self.index]
+    
+    @property
+    def blast_range(self):
+        """Tiles this player's explosions reach"""
+        return self.stats.range[self.index]
+    
+    @property
+    def can_kick(self):
+        """Whether walking into a bomb sends it sliding"""
+        return self.stats.kick[self.index] > 0
+    
+    @property
+    def x(self):
+        return self.fx / SUBPIXELS
+    
+    @x.setter
+    def x(self, value):
+        self.fx = round(value * SUBPIXELS)
+    
+    @property
+    def y(self):
+        return self.fy / SUBPIXELS
+    
+    @y.setter
+    def y(self, value):
+        self.fy = round(value * SUBPIXELS)
+    
+    def handle_input(self, keys):
+        """Handle keyboard input for movement"""
+        self.apply_input(read_input(keys))
+    
+    def apply_input(self, input_bits):
+        """Set the movement direction from an encoded input bitmask"""
+        self.input_bits = input_bits
+        self.dx = 0
+        self.dy = 0
         
-        # If diagonal movement failed, fall back to primary movement if possible
-        if self.dx == primary_dx and self.dy == primary_dy and not can_move_primary:
-            self.dx = 0
-            self.dy = 0
+        # Vertical keys take priority, as before
+        if input_bits & INPUT_UP:
+            self.dy = -self.speed
+        elif input_bits & INPUT_DOWN:
+            self.dy = self.speed
+        elif input_bits & INPUT_LEFT:
+            self.dx = -self.speed
+        elif input_bits & INPUT_RIGHT:
+            self.dx = self.speed
+    
+    def corner_bits(self, x, y, half_size):
+        """Bitmask of the tiles under the corners of a box, or None if it leaves the map"""
+        width = self.map_manager.width
+        left = int((x - half_size) // TILE_SIZE)
+        right = int((x + half_size) // TILE_SIZE)
+        top = int((y - half_size) // TILE_SIZE)
+        bottom = int((y + half_size) // TILE_SIZE)
+        if left < 0 or top < 0 or right >= width or bottom >= self.map_manager.height:
+            return None
+        return ((1 << (top * width + left)) | (1 << (top * width + right)) |
+                (1 << (bottom * width + left)) | (1 << (bottom * width + right)))
     
     def is_on_bomb(self):
         """Check if player is currently on a bomb"""
-        # Check if any part of the player is on a bomb
-        half_size = self.size // 2 - 1
-        
-        # Check all four corners of the player
-        corners = [
-            (self.x - half_size, self.y - half_size),  # Top-left
-            (self.x + half_size, self.y - half_size),  # Top-right
-            (self.x - half_size, self.y + half_size),  # Bottom-left
-            (self.x + half_size, self.y + half_size)   # Bottom-right
-        ]
-        
-        for bomb in self.bombs:
-            if not bomb.is_placeable():  # Bomb is still active
-                # Check if any corner of the player is on this bomb
-                for corner_x, corner_y in corners:
-                    corner_tile_x = int(corner_x // TILE_SIZE)
-                    corner_tile_y = int(corner_y // TILE_SIZE)
-                    
-                    if bomb.tile_x == corner_tile_x and bomb.tile_y == corner_tile_y:
-                        return True
-        
-        return False
+        # Check if any corner of the player is on an active bomb tile
+        bits = self.corner_bits(self.x, self.y, self.size // 2 - 1)
+        return bool(bits and bits & self.map_manager.bomb_mask)
     
-    def can_move_diagonally(self, x, y):
-        """More permissive collision check for diagonal movement"""
-        # Check the target tile first
-        target_tile_x = int(x // TILE_SIZE)
-        target_tile_y = int(y // TILE_SIZE)
-        
-        # Check bounds
-        if (target_tile_x < 0 or target_tile_x >= self.map_manager.get_width() or 
-            target_tile_y < 0 or target_tile_y >= self.map_manager.get_height()):
-            return False
-        
-        target_tile_type = self.map_manager.get_tile_type(target_tile_x, target_tile_y)
-        
-        # If target is not walkable, definitely can't move there
-        if target_tile_type != 0:  # Not grass
+    def is_in_blast(self):
+        """Quick check if any tile under the player is in an active explosion"""
+        blast_mask = self.map_manager.blast_mask
+        if not blast_mask:
             return False
-        
-        # NEW LOGIC: If we're currently on a bomb, allow movement to any walkable tile
-        on_bomb = self.is_on_bomb()
-        if on_bomb:
-            return True
-        
-        # If we're not on a bomb, check if target has a bomb
-        for bomb in self.bombs:
-            if bomb.tile_x == target_tile_x and bomb.tile_y == target_tile_y:
-                if not bomb.is_placeable():  # Bomb is still active
-                    return False
-        
-        # Check if we're in a corner situation (adjacent to 2+ walls)
-        current_tile_x = int(self.x // TILE_SIZE)
-        current_tile_y = int(self.y // TILE_SIZE)
-        
-        adjacent_walls = 0
-        for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]:  # Up, Right, Down, Left
-            check_x = current_tile_x + dx
-            check_y = current_tile_y + dy
-            if (0 <= check_x < self.map_manager.get_width() and 
-                0 <= check_y < self.map_manager.get_height()):
-                tile_type = self.map_manager.get_tile_type(check_x, check_y)
-                if tile_type != 0:  # Wall
-                    adjacent_walls += 1
-        
-        # Use smaller collision box for cornering
-        if adjacent_walls >= 2:
-            half_size = (self.size // 2) - 6  # Very small collision box for cornering
-        else:
-            half_size = (self.size // 2) - 4  # Normal small collision box
-        
-        # Check center and corners of the collision box
-        check_points = [
-            (x, y),  # Center
-            (x - half_size, y - half_size),  # Top-left
-            (x + half_size, y - half_size),  # Top-right
-            (x - half_size, y + half_size),  # Bottom-left
-            (x + half_size, y + half_size)   # Bottom-right
-        ]
-        
-        walkable_points = 0
-        
-        for check_x, check_y in check_points:
-            tile_x = int(check_x // TILE_SIZE)
-            tile_y = int(check_y // TILE_SIZE)
-            
-            # Check bounds
-            if (tile_x < 0 or tile_x >= self.map_manager.get_width() or 
-                tile_y < 0 or tile_y >= self.map_manager.get_height()):
-                continue
-            
-            tile_type = self.map_manager.get_tile_type(tile_x, tile_y)
-            if tile_type == 0:  # Grass is walkable
-                walkable_points += 1
-        
-        # Be permissive for diagonal movement - require center and at least 1 other point
-        return walkable_points >= 2
+        bits = self.corner_bits(self.x, self.y, self.size / 2 - BLAST_MARGIN)
+        return bool(bits and bits & blast_mask)
     
     def can_move_to(self, x, y):
         """Check if player can move to the given position"""
-        # Calculate the tile coordinates that the player would occupy
-        half_size = self.size // 2 - 1
-        
-        # Check all four corners of the player
-        corners = [
-            (x - half_size, y - half_size),  # Top-left
-            (x + half_size, y - half_size),  # Top-right
-            (x - half_size, y + half_size),  # Bottom-left
-            (x + half_size, y + half_size)   # Bottom-right
-        ]
+        # Tiles that the four corners of the player would occupy
+        bits = self.corner_bits(x, y, self.size // 2 - 1)
         
-        # Check if all corners are within walkable tiles
-        for corner_x, corner_y in corners:
-            tile_x = int(corner_x // TILE_SIZE)
-            tile_y = int(corner_y // TILE_SIZE)
-            
-            # Check bounds
-            if (tile_x < 0 or tile_x >= self.map_manager.get_width() or 
-                tile_y < 0 or tile_y >= self.map_manager.get_height()):
-                return False
-            
-            # Check if tile is walkable (0 = grass, 1 = unbreakable wall, 2 = breakable brick)
-            tile_type = self.map_manager.get_tile_type(tile_x, tile_y)
-            if tile_type != 0:  # Not walkable if not grass
-                return False
+        # Check bounds and that every corner is on grass
+        if bits is None or bits & self.map_manager.solid_mask:
+            return False
         
-        # NEW LOGIC: If we're currently on a bomb, allow movement to any walkable tile
-        on_bomb = self.is_on_bomb()
-        if on_bomb:
+        bomb_mask = self.map_manager.bomb_mask
+        if not bomb_mask:
             return True
         
-        # If we're not on a bomb, check if any corner would land on a bomb
-        for corner_x, corner_y in corners:
-            tile_x = int(corner_x // TILE_SIZE)
-            tile_y = int(corner_y // TILE_SIZE)
-            
-            for bomb in self.bombs:
-                if bomb.tile_x == tile_x and bomb.tile_y == tile_y:
-                    if not bomb.is_placeable():  # Bomb is still active
-                        return False
+        # If we're currently on a bomb, allow movement to any walkable tile
+        if self.is_on_bomb():
+            return True
         
-        return True
+        # If we're not on a bomb, no corner may land on a bomb
+        return not bits & bomb_mask
     
-    def move(self):
-        """Update player position"""
-        # Calculate new position
-        new_x = self.x + self.dx
-        new_y = self.y + self.dy
+    def move(self, ticks=1):
+        """Update player position, sweeping the collision box against the tile grid"""
+        distance = int(self.speed * SUBPIXELS * BASE_TICK_RATE / TICK_RATE) * ticks
+        
+        if self.dx:
+            axis, direction = 0, (1 if self.dx > 0 else -1)
+        elif self.dy:
+            axis, direction = 1, (1 if self.dy > 0 else -1)
+        else:
+            # Snap to grid when not moving
+            self.snap_to_grid()
+            return
         
-        # Check if we can move to the new position
-        can_move_x = self.can_move_to(new_x, self.y)
-        can_move_y = self.can_move_to(self.x, new_y)
+        blocked = self.blocked_mask()
+        moved = self.sweep(axis, direction, distance, blocked)
+        if moved < distance and self.can_kick:
+            self.kick_bomb(axis, direction)
+        
+        # A held horizontal key moves diagonally, e.g. UP+RIGHT slides right along a wall
+        bits = self.input_bits
+        if axis == 1 and bits & (INPUT_LEFT | INPUT_RIGHT):
+            self.sweep(0, -1 if bits & INPUT_LEFT else 1, distance, blocked)
+        elif moved < distance:
+            # Blocked - steer into the lane ahead if it is open, then carry on
+            distance -= moved
+            steered = self.corner_assist(axis, direction, distance, blocked)
+            if steered:
+                self.sweep(axis, direction, distance - steered, blocked)
+        
+        self.collect_powerup()
+        if self.tile_index() != self.hash_tile:
+            self.rehash()
+    
+    def collect_powerup(self):
+        """Pick up the power-up on the tile under the player's centre, if there is one"""
+        if not self.map_manager.powerups:
+            return
+        tile_x, tile_y = self.get_grid_position()
+        kind = self.map_manager.collect_powerup(tile_x, tile_y)
+        if kind is not None:
+            self.stats.apply(self.index, kind)
+            self.rehash()
+    
+    def kick_bomb(self, axis, direction):
+        """Send the bomb directly ahead sliding, if the player walked into one"""
+        tile_x, tile_y = self.get_grid_position()
+        if axis == 0:
+            tile_x += direction
+        else:
+            tile_y += direction
+        width = self.map_manager.width
+        if not (0 <= tile_x < width and 0 <= tile_y < self.map_manager.height):
+            return
+        if not self.map_manager.bomb_mask >> (tile_y * width + tile_x) & 1:
+            return
+        for bomb in self.bombs:
+            if not bomb.exploded and bomb.tile_x == tile_x and bomb.tile_y == tile_y:
+                bomb.kick(direction if axis == 0 else 0, direction if axis == 1 else 0)
+                return
+    
+    def store_previous_position(self):
+        """Remember where this tick started so rendering can interpolate from it"""
+        self.prev_fx = self.fx
+        self.prev_fy = self.fy
+    
+    def blocked_mask(self):
+        """Tiles the player cannot enter; bombs already under the player are passable"""
+        map_manager = self.map_manager
+        bomb_mask = map_manager.bomb_mask
+        if bomb_mask:
+            under = self.corner_bits(self.x, self.y, self.size // 2 - 1) or 0
+            bomb_mask &= ~under
+        return map_manager.solid_mask | bomb_mask
+    
+    def sweep(self, axis, direction, distance, blocked):
+        """Move along one axis until flush with the first blocked tile, returning the distance moved"""
+        tile = TILE_SIZE * SUBPIXELS
+        half = (self.size // 2 - 1) * SUBPIXELS
+        width = self.map_manager.width
+        height = self.map_manager.height
+        
+        if axis == 0:
+            position, cross, limit = self.fx, self.fy, width
+        else:
+            position, cross, limit = self.fy, self.fx, height
+        first_lane = (cross - half) // tile
+        last_lane = (cross + half) // tile
+        
+        # Walk only the tile columns (or rows) the leading edge crosses
+        edge = position + half * direction
+        target = edge + distance * direction
+        line = edge // tile + direction
+        last_line = target // tile
+        while (line <= last_line) if direction > 0 else (line >= last_line):
+            if not 0 <= line < limit:
+                lane_blocked = True
+            else:
+                lane_blocked = False
+                for lane in range(first_lane, last_lane + 1):
+                    index = lane * width + line if axis == 0 else line * width + lane
+                    if blocked >> index & 1:
+                        lane_blocked = True
+                        break
+            if lane_blocked:
+                # Stop flush against the blocked tile
+                target = line * tile - 1 if direction > 0 else (line + 1) * tile
+                break
+            line += direction
+        
+        moved = max(0, (target - edge) * direction)
+        if axis == 0:
+            self.fx += moved * direction
+        else:
+            self.fy += moved * direction
+        return moved
+    
+    def corner_assist(self, axis, direction, distance, blocked):
+        """Slide towards the current lane centre if the tile ahead in that lane is open"""
+        tile = TILE_SIZE * SUBPIXELS
+        width = self.map_manager.width
+        tile_x = self.fx // tile
+        tile_y = self.fy // tile
+        if axis == 0:
+            ahead = (tile_x + direction, tile_y)
+            offset = self.fy - (tile_y * tile + tile // 2)
+        else:
+            ahead = (tile_x, tile_y + direction)
+            offset = self.fx - (tile_x * tile + tile // 2)
         
-        # Update position based on what's allowed
-        if can_move_x:
-            self.x = new_x
-        if can_move_y:
-            self.y = new_y
+        if offset == 0 or abs(offset) > CORNER_ASSIST * SUBPIXELS:
+            return 0
+        if not (0 <= ahead[0] < width and 0 <= ahead[1] < self.map_manager.height):
+            return 0
+        if blocked >> (ahead[1] * width + ahead[0]) & 1:
+            return 0
         
-        # Snap to grid when not moving
-        if self.dx == 0 and self.dy == 0:
-            self.snap_to_grid()
+        return self.sweep(1 - axis, -1 if offset > 0 else 1, min(distance, abs(offset)), blocked)
     
     def snap_to_grid(self):
         """Snap player to nearest tile center"""
@@ -275,9 +312,9 @@ class Player:
         
         # Only snap if close enough (within 3 pixels)
         if abs(self.x - target_x) < 3:
-            self.x = target_x
+            self.fx = target_x * SUBPIXELS
         if abs(self.y - target_y) < 3:
-            self.y = target_y
+            self.fy = target_y * SUBPIXELS
     
     def place_bomb(self):
         """Place a bomb at current position"""
@@ -286,42 +323,95 @@ class Player:
             tile_x = int(self.x // TILE_SIZE)
             tile_y = int(self.y // TILE_SIZE)
             
-            # Check if there's already a bomb here that blocks placement
-            for bomb in self.bombs:
-                if bomb.tile_x == tile_x and bomb.tile_y == tile_y:
-                    if not bomb.is_placeable():
-                        return False
+            # Check if there's already an active bomb here that blocks placement
+            if self.map_manager.bomb_mask >> (tile_y * self.map_manager.width + tile_x) & 1:
+                return False
             
             # Create new bomb
             from bomb import Bomb
-            bomb = Bomb(tile_x, tile_y, self.map_manager)
+            bomb = Bomb(tile_x, tile_y, self.map_manager, self.events, self.scheduler, self.blast_range)
             self.bombs.append(bomb)
+            self.events.publish(BombPlaced(bomb))
             return True
         return False
     
-    def update_bombs(self, dt):
-        """Update all bombs"""
-        for bomb in self.bombs[:]:  # Copy list to avoid modification during iteration
-            bomb.update(dt)
-            if bomb.finished:  # Use the new finished state
-                self.bombs.remove(bomb)
+    def on_bomb_exploded(self, event):
+        """Add a new explosion to the blast mask"""
+        self.update_blast_mask()
+    
+    def on_explosion_ended(self, event):
+        """Drop a finished bomb and clear its tiles from the blast mask"""
+        if event.bomb in self.bombs:
+            self.bombs.remove(event.bomb)
+        self.update_blast_mask()
+    
+    def update_blast_mask(self):
+        """Rebuild the mask of tiles covered by active explosions, which may overlap"""
+        width = self.map_manager.width
+        blast_mask = 0
+        for bomb in self.bombs:
+            if bomb.exploded and bomb.explosion_ticks > 0:
+                for x, y in bomb.explosion_positions:
+                    blast_mask |= 1 << (y * width + x)
+        self.map_manager.blast_mask = blast_mask
+    
+    def save_state(self):
+        """Capture the player and bomb state as an immutable tuple"""
+        return (self.fx, self.fy, self.input_bits, tuple(bomb.save_state() for bomb in self.bombs))
+    
+    def load_state(self, state):
+        """Restore the player and bomb state from a tuple made by save_state"""
+        from bomb import Bomb
+        self.fx, self.fy, input_bits, bomb_states = state
+        self.store_previous_position()
+        self.apply_input(input_bits)
+        self.bombs = []
+        self.map_manager.bomb_mask = 0
+        for bomb_state in bomb_states:
+            bomb = Bomb(bomb_state[0], bomb_state[1], self.map_manager, self.events, self.scheduler)
+            bomb.load_state(bomb_state)
+            self.bombs.append(bomb)
+        self.update_blast_mask()
+        self.rehash()
+    
+    def tile_index(self):
+        """Index of the tile under the player's centre, y * width + x"""
+        tile = TILE_SIZE * SUBPIXELS
+        return self.fy // tile * self.map_manager.width + self.fx // tile
+    
+    def state_key(self):
+        """Zobrist key of the player's tile and stats"""
+        stats = sum(getattr(self.stats, name)[self.index] << 8 * i for i, name in enumerate(STAT_COLUMNS))
+        return (zobrist.key(zobrist.PLAYER, self.tile_index(), self.index) ^
+                zobrist.key(zobrist.PLAYER_STATS, self.index, stats))
+    
+    def rehash(self):
+        """Swap the player's old key in the state hash for its current one"""
+        key = self.state_key()
+        self.map_manager.state_hash ^= self.hash_key ^ key
+        self.hash_key = key
+        self.hash_tile = self.tile_index()
     
     def get_grid_position(self):
         """Get player's grid position"""
         return (int(self.x // TILE_SIZE), int(self.y // TILE_SIZE))
     
-    def render(self, screen):
-        """Render the player"""
+    def interpolated_position(self, alpha):
+        """Pixel position of the player's center alpha of the way from the previous tick to the current one"""
+        return ((self.prev_fx + (self.fx - self.prev_fx) * alpha) / SUBPIXELS,
+                (self.prev_fy + (self.fy - self.prev_fy) * alpha) / SUBPIXELS)
+    
+    def render(self, screen, alpha=1.0, camera=(0, 0)):
+        """Render the player, alpha of the way from the previous tick's position to the current one"""
         # Calculate render position (center of player)
-        render_x = self.x - self.size // 2
-        render_y = self.y - self.size // 2
+        center_x, center_y = self.interpolated_position(alpha)
+        render_x = center_x - camera[0] - self.size // 2
+        render_y = center_y - camera[1] - self.size // 2
         
-        # Get player sprite and scale it to player size
-        player_sprite = self.sprite_manager.get_sprite('player')
+        # Player sprite, already scaled to player size when it was loaded
+        player_sprite = self.sprite_manager.get_sprite('player_scaled')
         if player_sprite:
-            # Scale to player size for good visual fit
-            scaled_sprite = pygame.transform.scale(player_sprite, (self.size, self.size))
-            screen.blit(scaled_sprite, (render_x, render_y))
+            screen.blit(player_sprite, (render_x, render_y))
         else:
             # Fallback rectangle
             pygame.draw.rect(screen, (255, 0, 0), (render_x, render_y, self.size, self.size)) 
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Power-ups - Handles the power-up table, hidden power-up placement and per-player stat columns
+"""
+
+from array import array
+from collections import namedtuple
+import numpy as np
+import pygame
+from settings import PLAYER_MAX_BOMBS, PLAYER_SPEED, EXPLOSION_RANGE, POWERUP_DROP_CHANCE
+
+# A kind of power-up: the stat column it raises, by how much and up to what, how often it drops, and its icon
+PowerUp = namedtuple('PowerUp', 'name stat amount cap weight color label')
+
+# Power-up kind (index) -> what it does; maps store kinds as these indices
+POWERUPS = (
+    PowerUp('extra_bomb', 'bombs', 1, 8, 4, (50, 50, 60), "B"),
+    PowerUp('range', 'range', 1, 8, 4, (230, 90, 20), "F"),
+    PowerUp('speed', 'speed', 1, PLAYER_SPEED + 4, 3, (40, 150, 230), "S"),
+    PowerUp('kick', 'kick', 1, 1, 1, (60, 180, 60), "K"),
+)
+
+# Longest blast any bomb can have
+MAX_BLAST_RANGE = max([EXPLOSION_RANGE] + [powerup.cap for powerup in POWERUPS if powerup.stat == 'range'])
+
+# Stat columns and the values every player starts a match with
+STAT_COLUMNS = ('bombs', 'range', 'speed', 'kick')
+BASE_STATS = {'bombs': PLAYER_MAX_BOMBS, 'range': EXPLOSION_RANGE, 'speed': PLAYER_SPEED, 'kick': 0}
+
+class PlayerStats:
+    """Structure-of-arrays player stats: one compact byte column per stat, one row per player"""
+    def __init__(self, count=1):
+        self.count = count
+        self.reset()
+
+    def reset(self):
+        """Put every player back to the base stats"""
+        for name in STAT_COLUMNS:
+            setattr(self, name, array('B', [BASE_STATS[name]]) * self.count)
+
+    def apply(self, index, kind):
+        """Raise a player's stat for a collected power-up, up to its cap"""
+        powerup = POWERUPS[kind]
+        column = getattr(self, powerup.stat)
+        column[index] = min(column[index] + powerup.amount, powerup.cap)
+
+    def save_state(self):
+        """Capture every column as bytes"""
+        return tuple(getattr(self, name).tobytes() for name in STAT_COLUMNS)
+
+    def load_state(self, state):
+        """Restore the columns from a snapshot made by save_state"""
+        for name, column in zip(STAT_COLUMNS, state):
+            setattr(self, name, array('B', column))
+
+# Drop odds of each kind, in POWERUPS order
+POWERUP_ODDS = np.array([powerup.weight for powerup in POWERUPS], dtype=np.float64)
+POWERUP_ODDS /= POWERUP_ODDS.sum()
+
+def place_powerups(map_data, rng, chance=POWERUP_DROP_CHANCE):
+    """Hide power-ups under a share of the bricks, returning one byte per tile: 0 for none, else kind + 1"""
+    tiles = np.frombuffer(b''.join(map_data), dtype=np.uint8)
+    bricks = np.flatnonzero(tiles == 2)
+    # Drawn in bulk so large arenas stay fast, seeded from rng so a seeded map places the same power-ups
+    generator = np.random.default_rng(rng.getrandbits(64))
+    chosen = generator.choice(bricks, round(len(bricks) * chance), replace=False)
+    kinds = generator.choice(len(POWERUPS), len(chosen), p=POWERUP_ODDS)
+    hidden = np.zeros(len(tiles), dtype=np.uint8)
+    hidden[chosen] = kinds + 1
+    return bytearray(hidden.tobytes())
+
+def render_icons(size):
+    """Draw one tile-sized icon per power-up kind"""
+    font = pygame.font.Font(None, size * 3 // 4)
+    icons = []
+    for powerup in POWERUPS:
+        icon = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.rect(icon, powerup.color, icon.get_rect().inflate(-size // 6, -size // 6), border_radius=size // 6)
+        pygame.draw.rect(icon, (255, 255, 255), icon.get_rect().inflate(-size // 6, -size // 6), 2, border_radius=size // 6)
+        label = font.render(powerup.label, True, (255, 255, 255))
+        icon.blit(label, label.get_rect(center=(size // 2, size // 2)))
+        icons.append(icon.convert_alpha())
+    return icons
@@ -0,0 +1,226 @@
+"""
+Replay - Handles recording matches as inputs plus periodic keyframes, and the replay file format
+
+Binary layout, little-endian:
+    header      magic, format version, tick count, keyframe interval, metadata length
+    metadata    UTF-8 JSON object (map path, tick rate, ...)
+    inputs      one byte of input bits per tick
+    keyframes   tuple of (tick, Level.save_state()) pairs in the keyframe encoding
+
+Keyframe encoding: each value is a one-byte tag followed by its payload, with integers and lengths as
+LEB128 varints, so files read the same under any Python version:
+    0 None, 1 False, 2 True
+    3 int       zigzag varint
+    4 bytes     length, then the bytes
+    5 tuple     item count, then each item
+    6 shared    index of an earlier bytes or tuple, numbered in the order they were first written
+
+The simulation is deterministic, so any tick can be rebuilt from the keyframe before it and the inputs since.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import struct
+from settings import TICK_RATE, REPLAY_KEYFRAME_INTERVAL, REPLAY_DEATH_TAIL
+
+REPLAY_MAGIC = b'BMREPLAY'
+REPLAY_VERSION = 5
+REPLAY_HEADER = struct.Struct('<8sHIII')
+
+# Keyframe value tags
+VALUE_NONE, VALUE_FALSE, VALUE_TRUE, VALUE_INT, VALUE_BYTES, VALUE_TUPLE, VALUE_SHARED = range(7)
+
+class Replay:
+    """A recorded match: the input for every tick and full snapshots at regular ticks"""
+    def __init__(self, inputs, keyframes, keyframe_interval=REPLAY_KEYFRAME_INTERVAL, metadata=None):
+        self.inputs = bytes(inputs)
+        self.keyframes = dict(keyframes)
+        self.keyframe_interval = keyframe_interval
+        self.metadata = metadata or {}
+        self.keyframe_ticks = sorted(self.keyframes)
+
+    @property
+    def ticks(self):
+        """Number of recorded ticks"""
+        return len(self.inputs)
+
+    def keyframe_before(self, tick):
+        """Tick of the last keyframe at or before a tick"""
+        return self.keyframe_ticks[max(bisect.bisect_right(self.keyframe_ticks, tick) - 1, 0)]
+
+class ReplayRecorder:
+    """Records each match a level plays and saves it as its own replay file"""
+    def __init__(self, path, map_path=None, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.path = path
+        self.map_path = map_path
+        self.keyframe_interval = keyframe_interval
+        self.matches = 0
+        self.start()
+        # The death screen can exit the game directly, so save whatever is left
+        atexit.register(self.save)
+
+    def start(self):
+        """Begin recording a new match"""
+        self.inputs = bytearray()
+        self.keyframes = {}
+        self.death_tick = None
+
+    def record(self, level, input_bits):
+        """Store the input for the tick the level is about to simulate, snapshotting keyframe ticks"""
+        tick = level.tick
+        if level.player_dead:
+            # Keep a short tail for the death, not the whole time spent on the menu
+            if self.death_tick is None:
+                self.death_tick = tick
+            if tick - self.death_tick >= REPLAY_DEATH_TAIL:
+                return
+        if tick % self.keyframe_interval == 0:
+            self.keyframes[tick] = level.save_state()
+        if tick < len(self.inputs):
+            # Re-simulated after a rollback
+            self.inputs[tick] = input_bits
+        else:
+            self.inputs.append(input_bits)
+
+    def match_path(self):
+        """File the current match is saved to; matches after the first are numbered"""
+        if self.matches == 0:
+            return self.path
+        root, ext = os.path.splitext(self.path)
+        return f"{root}-{self.matches + 1}{ext}"
+
+    def save(self):
+        """Write the current match, if anything was recorded, and start the next one"""
+        if not self.inputs:
+            return None
+        path = self.match_path()
+        metadata = {'map': self.map_path, 'tick_rate': TICK_RATE}
+        write_replay(path, Replay(self.inputs, self.keyframes, self.keyframe_interval, metadata))
+        self.matches += 1
+        self.start()
+        return path
+
+def write_varint(out, value):
+    """Append a non-negative integer as a LEB128 varint"""
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def encode_value(value, out, shared):
+    """Append one keyframe value; a bytes or tuple object written before becomes a reference to it"""
+    if value is None:
+        out.append(VALUE_NONE)
+    elif value is False or value is True:
+        out.append(VALUE_TRUE if value else VALUE_FALSE)
+    elif isinstance(value, int):
+        out.append(VALUE_INT)
+        write_varint(out, value << 1 if value >= 0 else ~value << 1 | 1)
+    elif isinstance(value, (bytes, tuple)):
+        if id(value) in shared:
+            out.append(VALUE_SHARED)
+            write_varint(out, shared[id(value)])
+            return
+        shared[id(value)] = len(shared)
+        out.append(VALUE_BYTES if isinstance(value, bytes) else VALUE_TUPLE)
+        write_varint(out, len(value))
+        if isinstance(value, bytes):
+            out += value
+        else:
+            for item in value:
+                encode_value(item, out, shared)
+    else:
+        raise TypeError(f"Keyframes cannot hold {type(value).__name__} values")
+
+class KeyframeDecoder:
+    """Reads values written by encode_value back out of a buffer"""
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+        self.shared = []
+
+    def varint(self):
+        """Read a LEB128 varint"""
+        value = shift = 0
+        while True:
+            byte = self.data[self.offset]
+            self.offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def value(self):
+        """Read one value"""
+        tag = self.data[self.offset]
+        self.offset += 1
+        if tag <= VALUE_TRUE:
+            return (None, False, True)[tag]
+        if tag == VALUE_INT:
+            value = self.varint()
+            return ~(value >> 1) if value & 1 else value >> 1
+        if tag == VALUE_SHARED:
+            return self.shared[self.varint()]
+        if tag == VALUE_BYTES:
+            length = self.varint()
+            value = bytes(self.data[self.offset:self.offset + length])
+            if len(value) != length:
+                raise IndexError("bytes run past the end")
+            self.offset += length
+            self.shared.append(value)
+            return value
+        if tag == VALUE_TUPLE:
+            # Numbered before its items, as it was when written
+            index = len(self.shared)
+            self.shared.append(None)
+            value = tuple(self.value() for _ in range(self.varint()))
+            self.shared[index] = value
+            return value
+        raise ValueError(f"unknown keyframe value tag {tag}")
+
+def write_replay(path, replay):
+    """Write a replay file"""
+    metadata_bytes = json.dumps(replay.metadata).encode()
+    # Unchanged map snapshots are shared between keyframes, and the encoding stores them once
+    keyframes = tuple((tick, replay.keyframes[tick]) for tick in replay.keyframe_ticks)
+    keyframe_bytes = bytearray()
+    encode_value(keyframes, keyframe_bytes, {})
+    with open(path, 'wb') as f:
+        f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, replay.ticks, replay.keyframe_interval,
+                                   len(metadata_bytes)))
+        f.write(metadata_bytes)
+        f.write(replay.inputs)
+        f.write(keyframe_bytes)
+
+def read_replay(path):
+    """Read a replay file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < REPLAY_HEADER.size:
+        raise ValueError(f"{path} is too short to be a replay")
+    magic, version, ticks, keyframe_interval, metadata_length = REPLAY_HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC:
+        raise ValueError(f"{path} is not a replay")
+    if version != REPLAY_VERSION:
+        raise ValueError(f"{path} is replay format version {version}, expected {REPLAY_VERSION}")
+
+    offset = REPLAY_HEADER.size
+    metadata = json.loads(data[offset:offset + metadata_length] or b'{}')
+    offset += metadata_length
+    inputs = data[offset:offset + ticks]
+    if len(inputs) != ticks:
+        raise ValueError(f"{path} is truncated")
+    decoder = KeyframeDecoder(memoryview(data)[offset + ticks:])
+    try:
+        keyframes = decoder.value()
+    except IndexError:
+        raise ValueError(f"{path} is truncated") from None
+    except ValueError as error:
+        raise ValueError(f"{path} has damaged keyframes: {error}") from None
+    if decoder.offset != len(decoder.data):
+        raise ValueError(f"{path} has data after its keyframes")
+    if metadata.get('tick_rate', TICK_RATE) != TICK_RATE:
+        raise ValueError(f"{path} was recorded at {metadata['tick_rate']} ticks per second, the game runs at {TICK_RATE}")
+    return Replay(inputs, keyframes, keyframe_interval, metadata)
@@ -0,0 +1,79 @@
+"""
+Scheduler - Handles tick-based timers for bomb fuses and explosion lifetimes
+"""
+
+from settings import TIMER_WHEEL_SIZE
+
+class Timer:
+    """A callback due on a simulation tick"""
+    __slots__ = ('due', 'callback')
+
+    def __init__(self, due, callback):
+        self.due = due
+        self.callback = callback  # None once fired or cancelled
+
+class TimerWheel:
+    """Timers hashed into one slot per tick, so a tick only touches the timers that are due"""
+    def __init__(self, size=TIMER_WHEEL_SIZE, tick=0):
+        # Power of two so the slot is a mask of the tick
+        self.size = 1 << (size - 1).bit_length()
+        self.mask = self.size - 1
+        self.slots = [[] for _ in range(self.size)]
+        self.tick = tick  # Last tick that has been advanced to
+        self.firing = None  # Slot being fired, while advance runs callbacks
+
+    def next_tick(self):
+        """Soonest tick a newly scheduled timer can fire on"""
+        return self.tick if self.firing is not None else self.tick + 1
+
+    def schedule(self, due, callback):
+        """Call a callback on a tick, or on the next tick if that one has passed"""
+        due = max(due, self.next_tick())
+        timer = Timer(due, callback)
+        if self.firing is not None and due == self.tick:
+            # Due now - joins the slot being fired
+            self.firing.append(timer)
+        else:
+            self.slots[due & self.mask].append(timer)
+        return timer
+
+    def cancel(self, timer):
+        """Stop a timer from firing; it is dropped when its slot comes round"""
+        if timer is not None:
+            timer.callback = None
+
+    def reschedule(self, timer, due):
+        """Move a pending timer to another tick, returning its replacement"""
+        callback = timer.callback
+        self.cancel(timer)
+        return self.schedule(due, callback)
+
+    def advance(self, tick):
+        """Fire every timer due up to and including a tick"""
+        while self.tick < tick:
+            self.tick += 1
+            index = self.tick & self.mask
+            slot = self.slots[index]
+            if not slot:
+                continue
+            
+            self.slots[index] = []
+            self.firing = slot
+            # Callbacks may add timers due this tick, which the loop then reaches
+            for timer in slot:
+                callback = timer.callback
+                if callback is None:
+                    continue
+                if timer.due != self.tick:
+                    # Further ahead than the wheel is long - wait for the next lap
+                    self.slots[index].append(timer)
+                    continue
+                timer.callback = None
+                callback()
+            self.firing = None
+
+    def reset(self, tick=0):
+        """Drop every timer and restart the clock at a tick"""
+        self.slots = [[] for _ in range(self.size)]
+        self.tick = tick
+        self.firing = None
@@ -5,19 +5,61 @@ DISPLAY_WIDTH = 1280
 DISPLAY_HEIGHT = 960
 DISPLAY_CENTER = (DISPLAY_WIDTH/2, DISPLAY_HEIGHT/2)
 FONT_SIZE = 28
+FPS = 120  # Render rate; the simulation runs at TICK_RATE and is interpolated
+IDLE_FPS = 30  # Rate while a pause or death menu sits over a frozen frame
 
 # Game settings
 TILE_SIZE = 64
 GRID_WIDTH = 20
 GRID_HEIGHT = 15
-PLAYER_SPEED = 5  # Back to original speed
+PLAYER_SPEED = 5  # Pixels per 1/60 s, whatever the tick rate
 PLAYER_SIZE = 56  # Slightly smaller than tile for visual clarity
 BOMB_TIMER = 3000  # milliseconds (3 seconds)
 EXPLOSION_DURATION = 500  # milliseconds
 EXPLOSION_RANGE = 2  # tiles
+EXPLOSION_SPRITE_SCALE = 1.4  # Explosion sprites overlap neighbouring tiles
+BLAST_MARGIN = TILE_SIZE * 0.1  # Forgiving edge of each explosion tile, in pixels
+PLAYER_MAX_BOMBS = 2  # Bombs a player can have out before any power-ups
+POWERUP_DROP_CHANCE = 0.3  # Share of bricks hiding a power-up
+
+# Simulation settings
+TICK_RATE = 60  # Fixed simulation steps per second, 30 is fine on weak hardware
+BASE_TICK_RATE = 60  # Tick rate PLAYER_SPEED is tuned for
+TICK_MS = 1000 / TICK_RATE
+MAX_CATCHUP_TICKS = 5  # Drop simulation time beyond this many ticks per frame
+BOMB_FUSE_TICKS = BOMB_TIMER * TICK_RATE // 1000
+EXPLOSION_TICKS = EXPLOSION_DURATION * TICK_RATE // 1000
+BOMB_FRAME_TICKS = 200 * TICK_RATE // 1000  # Bomb fuse animation, 200 ms per frame
+BOMB_SLIDE_TICKS = max(1, 4 * TICK_RATE // 60)  # Ticks a kicked bomb takes to slide one tile
+TIMER_WHEEL_SIZE = 256  # Slots in the bomb timer wheel, ticks further out take extra laps
+
+# Particle settings
+PARTICLE_CAPACITY = 16384  # Preallocated particle slots
+PARTICLE_SIZE = 3  # pixels
+
+# Telemetry settings
+TELEMETRY_BUFFER_SIZE = 65536  # Events held in memory before the oldest are dropped
+TELEMETRY_FLUSH_INTERVAL = 1.0  # Seconds between background writes
+
+# Netplay settings
+ROLLBACK_WINDOW = 16  # Ticks of state kept for rollback re-simulation
+
+# Replay settings
+REPLAY_KEYFRAME_INTERVAL = 5 * TICK_RATE  # Ticks between full state snapshots, where export segments can start
+REPLAY_DEATH_TAIL = 2 * TICK_RATE  # Ticks still recorded after the player dies
+
+# Spectator wall settings
+SPECTATOR_DRAW_BUDGET = 480  # Thumbnail redraws per second across the whole wall
+SPECTATOR_MAX_RATE = 30  # Redraws per second of one thumbnail when few are shown
+SPECTATOR_MIN_RATE = 4  # Redraws per second of one thumbnail however many are shown
+SPECTATOR_PADDING = 8  # Pixels between thumbnails
+SPECTATOR_LABEL_SIZE = 20  # Font size of the match labels
+SPECTATOR_RESTART_DELAY = 2 * TICK_RATE  # Ticks a finished match stays up before restarting
 
 # Movement factors
 DIAGONAL_SPEED_FACTOR = math.sqrt(2) / 2
+SUBPIXELS = 256  # Fixed-point position units per pixel
+CORNER_ASSIST = 20  # Pixels off a lane centre the player is still steered into it
 
 # Colors
 BLACK = (0, 0, 0)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Soak Test - Plays bot-driven matches headlessly for hours and flags memory growth or frame-time drift
+Usage: python soak.py [--hours H] [--interval SECONDS] [--seed N] [--csv PATH]
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import gc
+import sys
+import time
+import random
+import resource
+import statistics
+import pygame
+from settings import *
+from main import Main
+from bot import RandomBot
+from powerups import POWERUPS
+from cli import argument
+
+# Samples ignored while scenes, caches and the allocator settle
+WARMUP_SAMPLES = 3
+
+# A metric that never drops over this many samples, and grows by more than its tolerance, is a leak
+GROWTH_WINDOW = 6
+GROWTH_TOLERANCE = {'rss_mb': 0.10, 'objects': 0.05, 'surfaces': 0}
+
+# Small counters that rise and fall in normal play are only a leak above a fixed ceiling
+MAX_BOMBS = max([PLAYER_MAX_BOMBS] + [powerup.cap for powerup in POWERUPS if powerup.stat == 'bombs'])
+COUNT_CEILING = {
+    'bombs': MAX_BOMBS,
+    'timers': 2 * MAX_BOMBS,  # A fuse and a slide step, or an explosion's end, per bomb
+    'handlers': 16,  # Well above the handful a level and its player subscribe
+}
+
+# Frame time p99 this many times the early p99 is drift
+DRIFT_FACTOR = 1.5
+
+# Game time runs far faster than real time here, so the death menu's real-time delay is shortened
+DEATH_MENU_DELAY = 0.1  # seconds
+
+class SimulatedClock:
+    """Stands in for pygame's clock so every frame advances one frame of game time, as fast as the CPU allows"""
+    def __init__(self):
+        self.frame_time = 0
+
+    def tick(self, framerate=0):
+        self.frame_time = 1000 / framerate if framerate else 0
+        return self.frame_time
+
+    def get_time(self):
+        return self.frame_time
+
+class SoakTest:
+    """Drives the game through menus, matches, pauses and deaths while sampling resource use"""
+    def __init__(self, seed=0, interval=60.0):
+        self.rng = random.Random(seed)
+        self.interval = interval
+        self.main = Main()
+        self.main.clock = SimulatedClock()
+        self.game_state_manager = self.main.game_state_manager
+
+        self.frame_times = []  # seconds per gameplay frame, since the last sample
+        self.menu_frames = 0  # frames on a menu or frozen screen, since the last sample
+        self.samples = []
+        self.state_frames = 0  # frames spent in the current state
+        self.last_state = None
+        self.quitting = False  # Pause menu selection moved to Quit to Menu
+
+    def press(self, key):
+        """Queue a key press for the next frame"""
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0))
+
+    def drive(self):
+        """Press keys the way a player moving through every screen would"""
+        state = self.game_state_manager.get_state()
+        if state != self.last_state:
+            self.last_state = state
+            self.state_frames = 0
+            self.quitting = False
+        self.state_frames += 1
+
+        if state == 'main_menu':
+            if self.state_frames > 10:
+                self.press(pygame.K_RETURN)  # Start Game
+        elif state == 'pause':
+            if self.quitting:
+                # Keep pressing until the menu's input cooldown lets it through
+                self.press(pygame.K_RETURN)
+            elif self.state_frames > 15 and self.rng.random() < 0.2:
+                # Usually resume, sometimes quit to the menu
+                if self.rng.random() < 0.2:
+                    self.game_state_manager.get_scene('pause').selected_option = 0
+                    self.press(pygame.K_DOWN)
+                    self.quitting = True
+                else:
+                    self.press(pygame.K_ESCAPE)
+        else:
+            level = self.game_state_manager.get_scene('level')
+            if level.input_source is None:
+                level.input_source = RandomBot(self.rng)
+                level.death_screen.menu_delay = DEATH_MENU_DELAY
+            if level.player_dead:
+                if level.death_screen.show_menu:
+                    self.press(pygame.K_RETURN)  # New Game
+            elif self.rng.random() < 0.001:
+                self.press(pygame.K_ESCAPE)
+
+    def sample(self, elapsed):
+        """Record resource use and frame-time percentiles since the last sample"""
+        gc.collect()
+        objects = gc.get_objects()
+        frame_ms = sorted(t * 1000 for t in self.frame_times)
+        self.frame_times = []
+        menu_frames, self.menu_frames = self.menu_frames, 0
+
+        level = self.game_state_manager.scenes.get('level')
+        sample = {
+            'elapsed': elapsed,
+            'rss_mb': rss_bytes() / 2 ** 20,
+            'objects': len(objects),
+            'surfaces': count_surfaces(objects),
+            'bombs': len(level.player.bombs) if level else 0,
+            'timers': sum(len(slot) for slot in level.scheduler.slots) if level else 0,
+            'handlers': sum(len(handlers) for handlers in level.events.handlers.values()) if level else 0,
+            'frames': len(frame_ms),
+            'menu_frames': menu_frames,
+            'p50_ms': percentile(frame_ms, 50),
+            'p99_ms': percentile(frame_ms, 99),
+        }
+        self.samples.append(sample)
+        return sample
+
+    def run(self, duration):
+        """Play for a number of seconds, printing a line per sample"""
+        start = last_sample = time.perf_counter()
+        print(format_header())
+        while True:
+            self.drive()
+            frame_start = time.perf_counter()
+            self.main.run_frame()
+            now = time.perf_counter()
+            # Only frames that drew the game count towards frame time; menus are nearly free
+            if self.main.idle or self.game_state_manager.get_state() == 'main_menu':
+                self.menu_frames += 1
+                # The game caps menus at IDLE_FPS, so don't spin through them
+                time.sleep(1 / IDLE_FPS)
+            else:
+                self.frame_times.append(now - frame_start)
+
+            if now - last_sample >= self.interval:
+                last_sample = now
+                print(format_sample(self.sample(now - start)), flush=True)
+                if now - start >= duration:
+                    break
+
+    def problems(self):
+        """Describe every metric that grew steadily and any frame-time drift"""
+        samples = self.samples[WARMUP_SAMPLES:]
+        found = []
+
+        window = samples[-GROWTH_WINDOW:]
+        if len(window) == GROWTH_WINDOW:
+            for metric, tolerance in GROWTH_TOLERANCE.items():
+                values = [sample[metric] for sample in window]
+                never_drops = all(b >= a for a, b in zip(values, values[1:]))
+                if never_drops and values[-1] > values[0] * (1 + tolerance):
+                    found.append(f"{metric} grew every sample: {values[0]:.6g} -> {values[-1]:.6g}")
+        for metric, ceiling in COUNT_CEILING.items():
+            peak = max((sample[metric] for sample in samples), default=0)
+            if peak > ceiling:
+                found.append(f"{metric} reached {peak}, above the ceiling of {ceiling}")
+
+        # Samples spent entirely on menus have no frame times
+        timed = [sample for sample in samples if sample['frames']]
+        if len(timed) >= 6:
+            early = statistics.median(sample['p99_ms'] for sample in timed[:3])
+            late = statistics.median(sample['p99_ms'] for sample in timed[-3:])
+            if late > early * DRIFT_FACTOR:
+                found.append(f"frame time p99 drifted: {early:.2f} ms -> {late:.2f} ms")
+        return found
+
+    def write_csv(self, path):
+        """Save every sample for plotting"""
+        with open(path, 'w') as f:
+            f.write(','.join(self.samples[0]) + '\n')
+            for sample in self.samples:
+                f.write(','.join(f"{value:.6g}" for value in sample.values()) + '\n')
+
+def rss_bytes():
+    """Current resident set size, or the peak where /proc is not available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+def count_surfaces(objects):
+    """Distinct Surfaces referenced from Python objects; Surfaces are not tracked by gc themselves"""
+    seen = set()
+    for obj in objects:
+        for referent in gc.get_referents(obj):
+            if isinstance(referent, pygame.Surface):
+                seen.add(id(referent))
+    return len(seen)
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+def format_header():
+    return f"{'time':>8} {'rss MB':>8} {'objects':>9} {'surfaces':>8} {'bombs':>5} {'timers':>6} {'handlers':>8} {'frames':>7} {'menus':>7} {'p50 ms':>7} {'p99 ms':>7}"
+
+def format_sample(sample):
+    return (f"{sample['elapsed']:>7.0f}s {sample['rss_mb']:>8.1f} {sample['objects']:>9} {sample['surfaces']:>8} "
+            f"{sample['bombs']:>5} {sample['timers']:>6} {sample['handlers']:>8} {sample['frames']:>7} {sample['menu_frames']:>7} "
+            f"{sample['p50_ms']:>7.2f} {sample['p99_ms']:>7.2f}")
+
+if __name__ == '__main__':
+    hours = argument('--hours', 1.0, float)
+    soak = SoakTest(seed=argument('--seed', 0, int), interval=argument('--interval', 60.0, float))
+    try:
+        soak.run(hours * 3600)
+    except KeyboardInterrupt:
+        print("Stopped early")
+
+    csv_path = argument('--csv')
+    if csv_path and soak.samples:
+        soak.write_csv(csv_path)
+
+    problems = soak.problems()
+    for problem in problems:
+        print(f"FLAGGED: {problem}")
+    if not problems:
+        print(f"No growth or drift over {len(soak.samples)} samples")
+    pygame.quit()
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Spectator Wall - Shows many concurrent matches at once as live thumbnails for venue screens
+Usage: python spectator.py [--matches N] [--map PATH] [--seed N] [REPLAY ...]
+Each replay file gets a thumbnail that plays it on a loop; the rest of the wall is filled with bot matches.
+"""
+
+import sys
+import math
+import random
+import pygame
+from settings import *
+from game_state_manager import GameStateManager
+from sprite_manager import SpriteManager, ANIMATION_CLIPS
+from animation import AnimationClip
+from level import Level
+from events import BrickDestroyed
+from replay import read_replay
+from bot import RandomBot
+from cli import argument, positional_arguments
+from powerups import render_icons
+
+class ThumbnailSprites:
+    """The game's sprites scaled down once to the thumbnail tile size"""
+    def __init__(self, sprite_manager, tile_size):
+        self.tile_size = tile_size
+        self.scale = tile_size / TILE_SIZE
+
+        # Indexed by tile type: grass, wall, brick
+        self.tiles = [self.scaled(sprite_manager.get_sprite(name)) for name in ('grass', 'wall', 'brick')]
+        self.clips = {}
+        for name, (sprite_name, table, loop) in ANIMATION_CLIPS.items():
+            frames = [self.scaled(frame) for frame in sprite_manager.get_sprite(sprite_name)]
+            self.clips[name] = AnimationClip(name, frames, table, loop)
+        self.player = self.scaled(sprite_manager.get_sprite('player_scaled'))
+        # Indexed by power-up kind, scaled from the full-size icons the level draws
+        self.powerups = [self.scaled(icon) for icon in render_icons(TILE_SIZE)]
+
+    def scaled(self, surface):
+        """Smoothly scale one sprite to thumbnail size"""
+        width, height = surface.get_size()
+        size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+        return pygame.transform.smoothscale(surface, size)
+
+class Match:
+    """A live match on the wall, played by a bot or from a replay, restarting a little after it ends"""
+    def __init__(self, level, rng, replay=None):
+        self.level = level
+        self.rng = rng
+        self.replay = replay
+        self.end_tick = None  # Tick the match ended on, while it waits to restart
+        level.effects = False  # Particles are too small to see on a thumbnail
+        if replay:
+            level.input_source = lambda level: replay.inputs[level.tick] if level.tick < replay.ticks else 0
+        else:
+            level.input_source = RandomBot(rng)
+        self.restart()
+
+    def restart(self):
+        """Start the match again, from the replay's first tick or a random spawn point"""
+        level = self.level
+        if self.replay:
+            level.reset()
+            level.load_state(self.replay.keyframes[0])
+        else:
+            level.reset(self.rng.randrange(len(level.map_manager.spawns)))
+        self.end_tick = None
+
+    def is_over(self):
+        """Check if the player died or the replay ran out"""
+        return self.level.player_dead or (self.replay is not None and self.level.tick >= self.replay.ticks)
+
+    def update(self, dt):
+        """Simulate the match for dt milliseconds"""
+        level = self.level
+        level.update(dt)
+        if self.is_over():
+            if self.end_tick is None:
+                self.end_tick = level.tick
+            elif level.tick - self.end_tick >= SPECTATOR_RESTART_DELAY:
+                self.restart()
+
+class MatchThumbnail:
+    """One match drawn small: a cached map layer with bombs, explosions and the player on top"""
+    def __init__(self, match, rect, sprites):
+        self.match = match
+        self.rect = rect
+        self.sprites = sprites
+        self.layer = None
+        self.events = None  # Event bus the layer is following
+
+    def build_layer(self):
+        """Draw every tile of the map once at thumbnail scale and follow brick changes from then on"""
+        level = self.match.level
+        map_manager = level.map_manager
+        tile_size = self.sprites.tile_size
+        tiles = self.sprites.tiles
+        self.layer = pygame.Surface((map_manager.width * tile_size, map_manager.height * tile_size)).convert()
+        self.layer.blits([(tiles[tile], (x * tile_size, y * tile_size))
+                          for y, row in enumerate(map_manager.map_data) for x, tile in enumerate(row)], doreturn=False)
+
+        # Level.reset makes a new event bus, which is how a restart shows up here
+        self.events = level.events
+        self.events.subscribe(BrickDestroyed, self.on_brick_destroyed)
+
+    def on_brick_destroyed(self, event):
+        """Patch the one tile that changed"""
+        tile_size = self.sprites.tile_size
+        self.layer.blit(self.sprites.tiles[0], (event.x * tile_size, event.y * tile_size))
+
+    def draw(self, surface):
+        """Draw the thumbnail, returning the area of the display it covers"""
+        level = self.match.level
+        if level.events is not self.events:
+            self.build_layer()
+
+        tile_size = self.sprites.tile_size
+        left, top = self.rect.topleft
+        blits = [(self.layer, self.rect.topleft)]
+        width = level.map_manager.width
+        icons = self.sprites.powerups
+        for index, kind in level.map_manager.powerups.items():
+            blits.append((icons[kind], (left + index % width * tile_size, top + index // width * tile_size)))
+        for bomb in level.player.bombs:
+            name, elapsed = bomb.animation_state()
+            frame = self.sprites.clips[name].frame_at(elapsed)
+            if not bomb.exploded:
+                blits.append((frame, (left + bomb.tile_x * tile_size, top + bomb.tile_y * tile_size)))
+            elif bomb.explosion_ticks > 0:
+                offset = (tile_size - frame.get_width()) // 2
+                for x, y in bomb.explosion_positions:
+                    blits.append((frame, (left + x * tile_size + offset, top + y * tile_size + offset)))
+        if not level.player_dead:
+            player = self.sprites.player
+            blits.append((player, (left + level.player.x * self.sprites.scale - player.get_width() // 2,
+                                   top + level.player.y * self.sprites.scale - player.get_height() // 2)))
+
+        # Explosions on the edge of the map would spill into the neighbouring thumbnail
+        surface.set_clip(self.rect)
+        surface.blits(blits, doreturn=False)
+        surface.set_clip(None)
+        return self.rect
+
+class SpectatorWall:
+    """Grid of match thumbnails, redrawn round-robin at a rate that drops as more matches are shown"""
+    def __init__(self, display_surface, clock, matches, sprite_manager):
+        self.display_surface = display_surface
+        self.clock = clock
+        self.matches = matches
+        self.font = pygame.font.Font(None, SPECTATOR_LABEL_SIZE)
+
+        # Lay out the largest thumbnails that fit, all at one whole-pixel tile size
+        map_width = max(match.level.map_manager.width for match in matches)
+        map_height = max(match.level.map_manager.height for match in matches)
+        self.columns, tile_size = self.layout(len(matches), map_width, map_height)
+        if tile_size < 1:
+            raise ValueError(f"{len(matches)} matches of {map_width}x{map_height} tiles do not fit on screen")
+        self.sprites = ThumbnailSprites(sprite_manager, tile_size)
+
+        self.thumbnails = []
+        self.labels = []
+        label_height = self.font.get_linesize()
+        cell_width = map_width * tile_size + SPECTATOR_PADDING
+        cell_height = map_height * tile_size + label_height + SPECTATOR_PADDING
+        rows = math.ceil(len(matches) / self.columns)
+        # Centre the grid on screen
+        origin_x = (DISPLAY_WIDTH - self.columns * cell_width + SPECTATOR_PADDING) // 2
+        origin_y = (DISPLAY_HEIGHT - rows * cell_height + SPECTATOR_PADDING) // 2
+        for i, match in enumerate(matches):
+            column, row = i % self.columns, i // self.columns
+            x = origin_x + column * cell_width
+            y = origin_y + row * cell_height + label_height
+            rect = pygame.Rect(x, y, match.level.map_manager.width * tile_size, match.level.map_manager.height * tile_size)
+            self.thumbnails.append(MatchThumbnail(match, rect, self.sprites))
+            name = match.level.map_manager.metadata.get('name', "Arena")
+            self.labels.append((self.font.render(f"Match {i + 1} - {name}", True, WHITE), (x, y - label_height)))
+
+        # Each thumbnail gets an even share of the redraw budget, within limits
+        self.rate = min(max(SPECTATOR_DRAW_BUDGET / len(matches), SPECTATOR_MIN_RATE), SPECTATOR_MAX_RATE)
+        self.redraw_credit = 0.0  # Thumbnail redraws owed, carried between frames
+        self.next_thumbnail = 0
+        self.background_drawn = False
+
+    def layout(self, count, map_width, map_height):
+        """Column count and tile size that make the biggest thumbnails for count matches"""
+        label_height = self.font.get_linesize()
+        best = (1, 0)
+        for columns in range(1, count + 1):
+            rows = math.ceil(count / columns)
+            cell_width = (DISPLAY_WIDTH - SPECTATOR_PADDING * (columns + 1)) // columns
+            cell_height = (DISPLAY_HEIGHT - SPECTATOR_PADDING * (rows + 1)) // rows - label_height
+            tile_size = min(cell_width // map_width, cell_height // map_height)
+            if tile_size > best[1]:
+                best = (columns, tile_size)
+        return best
+
+    def update(self, dt):
+        """Simulate every match for dt milliseconds"""
+        for match in self.matches:
+            match.update(dt)
+
+    def draw(self, dt):
+        """Redraw the thumbnails that are due, returning the areas of the display that changed"""
+        if not self.background_drawn:
+            self.display_surface.fill(BLACK)
+            self.display_surface.blits(self.labels, doreturn=False)
+            for thumbnail in self.thumbnails:
+                thumbnail.draw(self.display_surface)
+            self.background_drawn = True
+            return None
+
+        # Spread the redraws evenly, oldest first, so no thumbnail falls behind the others
+        count = len(self.thumbnails)
+        self.redraw_credit = min(self.redraw_credit + self.rate * count * dt / 1000, count)
+        redraws = int(self.redraw_credit)
+        self.redraw_credit -= redraws
+        dirty = []
+        for _ in range(redraws):
+            dirty.append(self.thumbnails[self.next_thumbnail].draw(self.display_surface))
+            self.next_thumbnail = (self.next_thumbnail + 1) % count
+        return dirty
+
+    def run(self, events):
+        """Simulate and draw one frame, returning the dirty areas or None after a full redraw"""
+        dt = self.clock.get_time()
+        self.update(dt)
+        return self.draw(dt)
+
+def create_matches(display_surface, sprite_manager, count, replay_paths, map_path, seed):
+    """One match per replay, then bot matches up to count"""
+    rng = random.Random(seed)
+    matches = []
+    for path in replay_paths:
+        replay = read_replay(path)
+        level = Level(display_surface, GameStateManager('level'), None, sprite_manager, replay.metadata.get('map'))
+        matches.append(Match(level, random.Random(rng.random()), replay))
+    while len(matches) < count:
+        level = Level(display_surface, GameStateManager('level'), None, sprite_manager, map_path)
+        matches.append(Match(level, random.Random(rng.random())))
+    return matches
+
+if __name__ == '__main__':
+    replay_paths = positional_arguments(('--matches', '--map', '--seed'))
+
+    pygame.init()
+    display_surface = pygame.display.set_mode((DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    pygame.display.set_caption("Bomberman - Spectator Wall")
+    clock = pygame.time.Clock()
+    sprite_manager = SpriteManager()
+
+    matches = create_matches(display_surface, sprite_manager, max(argument('--matches', 16, int), len(replay_paths)),
+                             replay_paths, argument('--map'), argument('--seed', 0, int))
+    wall = SpectatorWall(display_surface, clock, matches, sprite_manager)
+
+    while True:
+        clock.tick(FPS)
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                sys.exit()
+        dirty = wall.run(events)
+        if dirty is None:
+            pygame.display.update()
+        elif dirty:
+            pygame.display.update(dirty)
@@ -4,66 +4,237 @@ Sprite Manager - Handles loading and managing all game sprites
 
 import pygame
 import os
-from settings import TILE_SIZE
+import json
+import math
+import struct
+import threading
+import time
+from settings import TILE_SIZE, PLAYER_SIZE, EXPLOSION_SPRITE_SCALE, EXPLOSION_TICKS, BOMB_FRAME_TICKS
+from animation import AnimationClip
+
+IMAGES_PATH = "images"
+ATLAS_IMAGE = os.path.join(IMAGES_PATH, "atlas.png")
+ATLAS_INDEX = os.path.join(IMAGES_PATH, "atlas.json")
+ATLAS_CACHE = os.path.join(IMAGES_PATH, "atlas.cache")
+
+# Raw cache header: magic, tile size, atlas width, atlas height, index length
+CACHE_MAGIC = b'BMATLAS1'
+CACHE_HEADER = struct.Struct('<8sHHHI')
+
+# Sprite name -> image file, or list of files for animation frames
+SPRITE_FILES = {
+    'grass': "grass_tile.png",
+    'wall': "wall_tile.png",
+    'brick': "brick_tile.png",
+    'player': "player_sprite.png",
+    'bomb': ["bomb_sprite.png", "bomb_sprite_1.png", "bomb_sprite_2.png"],
+    'explosion': ["explosion_1.png", "explosion_2.png", "explosion_3.png"],
+}
+
+# Animation clips: sprite frames, frame table of (frame index, ticks shown), loop
+ANIMATION_CLIPS = {
+    'bomb': ('bomb', [(0, BOMB_FRAME_TICKS), (1, BOMB_FRAME_TICKS), (2, BOMB_FRAME_TICKS)], True),
+    'explosion': ('explosion_scaled', [(0, EXPLOSION_TICKS // 3), (1, EXPLOSION_TICKS // 3),
+                                       (2, EXPLOSION_TICKS - 2 * (EXPLOSION_TICKS // 3))], False),
+}
+
+def load_source(filename):
+    """Load one source image scaled to tile size, magenta if missing"""
+    path = os.path.join(IMAGES_PATH, filename)
+    try:
+        sprite = pygame.image.load(path)
+        return pygame.transform.scale(sprite, (TILE_SIZE, TILE_SIZE))
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error loading sprite {path}: {e}")
+        # Return a colored rectangle as fallback
+        surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        surface.fill((255, 0, 255))  # Magenta for missing sprites
+        return surface
+
+def pack_atlas():
+    """Pack every sprite into one surface, returning it with a name -> rect index"""
+    cells = []
+    for name, files in SPRITE_FILES.items():
+        if isinstance(files, list):
+            cells.extend((name, i, filename) for i, filename in enumerate(files))
+        else:
+            cells.append((name, None, files))
+
+    # All sprites are tile sized, so a square-ish grid packs them tightly
+    columns = math.ceil(math.sqrt(len(cells)))
+    rows = math.ceil(len(cells) / columns)
+    atlas = pygame.Surface((columns * TILE_SIZE, rows * TILE_SIZE), pygame.SRCALPHA)
+
+    index = {}
+    for cell, (name, frame, filename) in enumerate(cells):
+        rect = [(cell % columns) * TILE_SIZE, (cell // columns) * TILE_SIZE, TILE_SIZE, TILE_SIZE]
+        atlas.blit(load_source(filename), rect[:2])
+        if frame is None:
+            index[name] = rect
+        else:
+            index.setdefault(name, []).append(rect)
+    return atlas, index
+
+def source_mtime():
+    """Newest modification time of the images the atlas is built from"""
+    paths = [ATLAS_IMAGE, ATLAS_INDEX]
+    for files in SPRITE_FILES.values():
+        for filename in (files if isinstance(files, list) else [files]):
+            paths.append(os.path.join(IMAGES_PATH, filename))
+    return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=0)
+
+def save_atlas_image(atlas, index):
+    """Write the atlas as a PNG with a JSON metadata index"""
+    pygame.image.save(atlas, ATLAS_IMAGE)
+    with open(ATLAS_INDEX, 'w') as f:
+        json.dump({'tile_size': TILE_SIZE, 'sprites': index}, f, indent=2)
+
+def save_atlas_cache(atlas, index):
+    """Write the atlas as raw RGBA pixels so later launches skip PNG decoding"""
+    index_bytes = json.dumps(index).encode()
+    width, height = atlas.get_size()
+    # Written to a temporary file first so an interrupted launch never leaves half a cache behind
+    temporary = ATLAS_CACHE + '.tmp'
+    try:
+        with open(temporary, 'wb') as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, TILE_SIZE, width, height, len(index_bytes)))
+            f.write(index_bytes)
+            f.write(pygame.image.tobytes(atlas, 'RGBA'))
+        os.replace(temporary, ATLAS_CACHE)
+    except OSError as e:
+        print(f"Error writing atlas cache {ATLAS_CACHE}: {e}")
 
 class SpriteManager:
-    def __init__(self):
+    def __init__(self, background=False):
         self.sprites = {}
-        self.load_sprites()
-    
+        self.clips = {}
+        self.atlas = None
+        self.load_time = 0  # milliseconds spent decoding the atlas
+
+        # Background decoding
+        self._decoded = None
+        self._thread = None
+
+        if background:
+            self.start_background_load()
+        else:
+            self.load_sprites()
+
     def load_sprites(self):
-        """Load all sprites from the images folder"""
-        images_path = "images"
-        
-        # Load tile sprites
-        self.sprites['grass'] = self.load_sprite(os.path.join(images_path, "grass_tile.png"))
-        self.sprites['wall'] = self.load_sprite(os.path.join(images_path, "wall_tile.png"))
-        self.sprites['brick'] = self.load_sprite(os.path.join(images_path, "brick_tile.png"))
-        
-        # Load player sprite
-        self.sprites['player'] = self.load_sprite(os.path.join(images_path, "player_sprite.png"))
+        """Load all sprites as subsurfaces of a single packed atlas"""
+        self.decode_atlas()
+        self.finish_loading()
+
+    def start_background_load(self):
+        """Decode the atlas on a worker thread so the caller can keep rendering"""
+        self._thread = threading.Thread(target=self.decode_atlas, name="sprite-loader", daemon=True)
+        self._thread.start()
+
+    def wait_until_loaded(self):
+        """Block until the sprites are ready to use"""
+        if self.atlas is not None:
+            return
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._decoded is None:
+            # Background decode failed or never ran - load on this thread
+            self.decode_atlas()
+        self.finish_loading()
+
+    def is_loaded(self):
+        """Check if the sprites can be used without blocking"""
+        return self.atlas is not None
+
+    def decode_atlas(self):
+        """Read the atlas pixels from the cache, atlas PNG or source images"""
+        start = time.perf_counter()
+        atlas, index = self.load_atlas_cache()
+        if atlas is None:
+            atlas, index = self.load_atlas_image()
+            if atlas is None:
+                atlas, index = pack_atlas()
+            save_atlas_cache(atlas, index)
+        self._decoded = (atlas, index)
+        self.load_time = (time.perf_counter() - start) * 1000
+
+    def finish_loading(self):
+        """Convert the decoded atlas for fast blitting and slice it into sprites"""
+        # Pixel format conversion needs the display, so it runs on the main thread
+        atlas, index = self._decoded
+        self._decoded = None
+        self.atlas = atlas.convert_alpha()
+        for name, rects in index.items():
+            if isinstance(rects[0], list):
+                self.sprites[name] = [self.atlas.subsurface(rect) for rect in rects]
+            else:
+                self.sprites[name] = self.atlas.subsurface(rects)
         
-        # Load bomb sprites (animation frames)
-        self.sprites['bomb'] = [
-            self.load_sprite(os.path.join(images_path, "bomb_sprite.png")),
-            self.load_sprite(os.path.join(images_path, "bomb_sprite_1.png")),
-            self.load_sprite(os.path.join(images_path, "bomb_sprite_2.png"))
+        # Explosions and the player are drawn at other sizes, so scale them once rather than per frame
+        scaled_size = int(TILE_SIZE * EXPLOSION_SPRITE_SCALE)
+        self.sprites['explosion_scaled'] = [
+            pygame.transform.scale(frame, (scaled_size, scaled_size)) for frame in self.sprites['explosion']
         ]
+        self.sprites['player_scaled'] = pygame.transform.scale(self.sprites['player'], (PLAYER_SIZE, PLAYER_SIZE))
         
-        # Load explosion sprites (animation frames)
-        self.sprites['explosion'] = [
-            self.load_sprite(os.path.join(images_path, "explosion_1.png")),
-            self.load_sprite(os.path.join(images_path, "explosion_2.png")),
-            self.load_sprite(os.path.join(images_path, "explosion_3.png"))
-        ]
-    
-    def load_sprite(self, path):
-        """Load and scale a sprite"""
+        for name, (sprite_name, table, loop) in ANIMATION_CLIPS.items():
+            self.clips[name] = AnimationClip(name, self.sprites[sprite_name], table, loop)
+
+    def load_atlas_cache(self):
+        """Load the raw pixel cache if it is newer than every source image"""
+        if not os.path.exists(ATLAS_CACHE) or os.path.getmtime(ATLAS_CACHE) < source_mtime():
+            return None, None
+        with open(ATLAS_CACHE, 'rb') as f:
+            data = f.read()
+        if len(data) < CACHE_HEADER.size:
+            return None, None
+        magic, tile_size, width, height, index_length = CACHE_HEADER.unpack_from(data)
+        if magic != CACHE_MAGIC or tile_size != TILE_SIZE:
+            return None, None
+
+        # A cache cut short or otherwise damaged is ignored, and rewritten from the PNG or source images
+        pixels_start = CACHE_HEADER.size + index_length
+        if len(data) != pixels_start + width * height * 4:
+            return None, None
+        try:
+            index = json.loads(data[CACHE_HEADER.size:pixels_start])
+            atlas = pygame.image.frombytes(data[pixels_start:], (width, height), 'RGBA')
+        except ValueError:
+            # JSON decode errors are ValueErrors too
+            return None, None
+        return atlas, index
+
+    def load_atlas_image(self):
+        """Load the atlas PNG made by build_atlas.py, if it matches the tile size"""
+        if not (os.path.exists(ATLAS_IMAGE) and os.path.exists(ATLAS_INDEX)):
+            return None, None
+        with open(ATLAS_INDEX) as f:
+            metadata = json.load(f)
+        if metadata.get('tile_size') != TILE_SIZE:
+            return None, None
         try:
-            sprite = pygame.image.load(path).convert_alpha()
-            # Scale to tile size if it's a tile sprite
-            if 'tile' in path or 'sprite' in path:
-                sprite = pygame.transform.scale(sprite, (TILE_SIZE, TILE_SIZE))
-            return sprite
+            return pygame.image.load(ATLAS_IMAGE), metadata['sprites']
         except pygame.error as e:
-            print(f"Error loading sprite {path}: {e}")
-            # Return a colored rectangle as fallback
-            surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            surface.fill((255, 0, 255))  # Magenta for missing sprites
-            return surface
-    
+            print(f"Error loading atlas {ATLAS_IMAGE}: {e}")
+            return None, None
+
     def get_sprite(self, name):
         """Get a sprite by name"""
         return self.sprites.get(name)
+
+    def get_clip(self, name):
+        """Get an animation clip by name"""
+        return self.clips.get(name)
     
     def get_bomb_frame(self, frame_index):
         """Get a specific bomb animation frame"""
         if 'bomb' in self.sprites and frame_index < len(self.sprites['bomb']):
             return self.sprites['bomb'][frame_index]
         return self.sprites.get('bomb', [None])[0]
-    
-    def get_explosion_frame(self, frame_index):
-        """Get a specific explosion animation frame"""
-        if 'explosion' in self.sprites and frame_index < len(self.sprites['explosion']):
-            return self.sprites['explosion'][frame_index]
-        return self.sprites.get('explosion', [None])[0] 
\ No newline at end of file
+
+    def get_explosion_frame(self, frame_index, scaled=False):
+        """Get a specific explosion animation frame, optionally at its drawn size"""
+        name = 'explosion_scaled' if scaled else 'explosion'
+        if name in self.sprites and frame_index < len(self.sprites[name]):
+            return self.sprites[name][frame_index]
+        return self.sprites.get(name, [None])[0]
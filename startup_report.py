@@ -0,0 +1,34 @@
+"""
+Startup Report - Measures time from launch to the first rendered frame
+"""
+
+import time
+
+class StartupReport:
+    def __init__(self, start_time):
+        self.start_time = start_time
+        self.last_time = start_time
+        self.phases = []  # (name, milliseconds, ran in background)
+
+    def mark(self, phase):
+        """Close a phase that ran on the main thread since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last_time) * 1000, False))
+        self.last_time = now
+
+    def add(self, phase, duration):
+        """Record a phase measured elsewhere, e.g. on a background thread"""
+        self.phases.append((phase, duration, True))
+
+    def total(self):
+        """Milliseconds from launch to the last mark"""
+        return (self.last_time - self.start_time) * 1000
+
+    def format(self):
+        """Format the report as printable lines"""
+        lines = ["Startup report:"]
+        for phase, duration, background in self.phases:
+            suffix = " (background)" if background else ""
+            lines.append(f"  {phase:<12} {duration:8.1f} ms{suffix}")
+        lines.append(f"  {'total':<12} {self.total():8.1f} ms")
+        return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Telemetry - Handles low-overhead gameplay event logging with a background writer
+"""
+
+import atexit
+import collections
+import json
+import struct
+import threading
+from settings import TELEMETRY_BUFFER_SIZE, TELEMETRY_FLUSH_INTERVAL, TICK_RATE
+
+# Event codes
+BOMB_PLACED = 1
+BOMB_DETONATED = 2
+CHAIN_REACTION = 3
+BRICKS_DESTROYED = 4
+PLAYER_DIED = 5
+TICK_SUMMARY = 6
+
+# Event code -> name and integer field names
+EVENT_FIELDS = {
+    BOMB_PLACED: ('bomb_placed', ('x', 'y')),
+    BOMB_DETONATED: ('bomb_detonated', ('x', 'y', 'tiles')),
+    CHAIN_REACTION: ('chain_reaction', ('length',)),
+    BRICKS_DESTROYED: ('bricks_destroyed', ('x', 'y', 'count')),
+    PLAYER_DIED: ('player_died', ('x', 'y', 'cause', 'bomb_x', 'bomb_y')),
+    TICK_SUMMARY: ('tick_summary', ('ticks', 'mean_us', 'p95_us', 'max_us')),
+}
+
+# Death causes
+CAUSE_EXPLOSION = 1
+CAUSE_NAMES = {CAUSE_EXPLOSION: 'explosion'}
+
+# Binary format: header, then fixed-size records of code, tick and five fields
+BINARY_MAGIC = b'BMTEL001'
+RECORD = struct.Struct('<BI5i')
+
+class Telemetry:
+    """Buffers events in memory on the game thread and writes them in batches on another"""
+    def __init__(self, path, buffer_size=TELEMETRY_BUFFER_SIZE, flush_interval=TELEMETRY_FLUSH_INTERVAL):
+        self.path = path
+        self.binary = not path.endswith('.jsonl')
+        self.file = open(path, 'wb' if self.binary else 'w')
+        if self.binary:
+            self.file.write(BINARY_MAGIC)
+
+        # Appending a tuple is all the game thread does per event
+        self.buffer = collections.deque(maxlen=buffer_size)
+        self.tick_times = []
+
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="telemetry-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def emit(self, code, tick, *fields):
+        """Queue an event; formatting and I/O happen on the writer thread"""
+        self.buffer.append((code, tick) + fields)
+
+    def record_tick_time(self, tick, seconds):
+        """Collect one tick's duration and emit a summary every second of ticks"""
+        self.tick_times.append(seconds)
+        if len(self.tick_times) >= TICK_RATE:
+            times = sorted(self.tick_times)
+            self.tick_times = []
+            self.emit(TICK_SUMMARY, tick, len(times),
+                      int(sum(times) / len(times) * 1e6),
+                      int(times[int(len(times) * 0.95)] * 1e6),
+                      int(times[-1] * 1e6))
+
+    def run(self):
+        """Writer thread loop"""
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write every buffered event to the file"""
+        with self.lock:
+            if self.file is None:
+                return
+            batch = []
+            buffer = self.buffer
+            while buffer:
+                batch.append(buffer.popleft())
+            if not batch:
+                return
+            if self.binary:
+                self.file.write(b''.join(RECORD.pack(*event, *(0,) * (7 - len(event))) for event in batch))
+            else:
+                self.file.write(''.join(json.dumps(format_event(event)) + '\n' for event in batch))
+            self.file.flush()
+
+    def close(self):
+        """Stop the writer thread and flush what is left"""
+        self.stop_event.set()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.flush()
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+def format_event(event):
+    """Turn a raw event tuple into a dict with named fields"""
+    code, tick = event[0], event[1]
+    name, field_names = EVENT_FIELDS[code]
+    record = {'event': name, 'tick': tick}
+    record.update(zip(field_names, event[2:]))
+    if code == PLAYER_DIED:
+        record['cause'] = CAUSE_NAMES.get(record['cause'], record['cause'])
+    return record
+
+def read_events(path):
+    """Yield events as dicts from a JSONL or binary telemetry file"""
+    if path.endswith('.jsonl'):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(path, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a telemetry file")
+        data = f.read()
+    for fields in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+        field_names = EVENT_FIELDS[fields[0]][1]
+        yield format_event(fields[:2 + len(field_names)])
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Zobrist - Handles the 64-bit keys XORed together into the incremental game state hash
+
+Every feature of the state (a tile's type, a bomb on a tile, a player's tile, ...) has its own
+pseudo-random key, and the state hash is the XOR of the keys of every feature present. A change
+to the state XORs the old feature's key out and the new one in, so the hash never needs a full pass.
+
+Keys come from a fixed mixing function rather than stored random tables, so arenas of any size
+get the same keys in every process and on every machine.
+"""
+
+import numpy as np
+
+# Feature kinds, mixed into every key so equal indices and values of different kinds never share one
+TILE = 1  # value: tile type
+HIDDEN_POWERUP = 2  # value: power-up kind
+POWERUP = 3  # value: power-up kind
+BOMB = 4  # value: tick the fuse runs out
+BOMB_RANGE = 5  # value: blast range
+BOMB_SLIDE = 6  # value: tick of the next slide step and direction
+EXPLOSION = 7  # value: tick the explosion ends
+PLAYER = 8  # index: player's tile, value: player index
+PLAYER_STATS = 9  # index: player index, value: packed stat columns
+PLAYER_DEAD = 10  # index: player index
+
+MASK = (1 << 64) - 1
+
+def mix(value):
+    """SplitMix64 finalizer: a bijection on 64-bit integers that scatters every input bit"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+def key(kind, index, value=0):
+    """Key for one feature: its kind, the tile (or player) index it sits at and its value"""
+    return mix((mix((kind << 32) | index) + value) & MASK)
+
+def mix_array(values):
+    """mix() over a uint64 array, wrapping on overflow"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def combined_keys(kind, indices, values):
+    """XOR of the keys of many features of one kind, for hashing a whole map in one pass"""
+    indices = np.asarray(indices, dtype=np.uint64)
+    values = np.asarray(values, dtype=np.uint64)
+    keys = mix_array(mix_array(np.uint64(kind << 32) | indices) + values)
+    return int(np.bitwise_xor.reduce(keys)) if len(keys) else 0